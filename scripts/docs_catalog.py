@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+SQLite каталог зеркала документации
+
+Единое место для метаданных всех документов: источник, URL, локальный
+путь, хеш и размер содержимого, время загрузки, HTTP валидаторы
+(ETag / Last-Modified) и оглавление (заголовки разделов). В каталог
+пишут загрузчики, split_r2r_docs.py и rename_sections.py.
+
+Записи буферизуются и сбрасываются пакетами в одной транзакции,
+база работает в режиме WAL.
+
+Примеры:
+    python scripts/docs_catalog.py --scan
+    python scripts/docs_catalog.py --changed-since 1d
+    python scripts/docs_catalog.py --larger-than 50
+"""
+
+import argparse
+import hashlib
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from docs_common import (
+    BASE_DIR,
+    DOCS_DIR,
+    INDEX_DIR,
+    iter_doc_files,
+    parse_headings,
+    to_project_path,
+)
+
+DEFAULT_CATALOG_PATH = INDEX_DIR / "catalog.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    url TEXT,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    changed_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_sha256 ON documents(sha256);
+CREATE INDEX IF NOT EXISTS idx_documents_source ON documents(source);
+CREATE INDEX IF NOT EXISTS idx_documents_size ON documents(size);
+CREATE INDEX IF NOT EXISTS idx_documents_changed_at ON documents(changed_at);
+
+CREATE TABLE IF NOT EXISTS sections (
+    path TEXT NOT NULL REFERENCES documents(path) ON DELETE CASCADE ON UPDATE CASCADE,
+    position INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (path, position)
+);
+"""
+
+UPSERT_DOCUMENT = """
+INSERT INTO documents (
+    path, source, url, sha256, size, fetched_at, etag, last_modified, changed_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    source = excluded.source,
+    url = COALESCE(excluded.url, documents.url),
+    fetched_at = COALESCE(excluded.fetched_at, documents.fetched_at),
+    etag = COALESCE(excluded.etag, documents.etag),
+    last_modified = COALESCE(excluded.last_modified, documents.last_modified),
+    changed_at = CASE WHEN documents.sha256 = excluded.sha256
+        THEN documents.changed_at ELSE excluded.changed_at END,
+    sha256 = excluded.sha256,
+    size = excluded.size,
+    updated_at = excluded.updated_at
+"""
+
+
+def utc_now() -> str:
+    """Текущее время UTC в формате ISO 8601 (сравнимо как строка)"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_since(value: str) -> str:
+    """
+    Разобрать момент времени для --changed-since
+
+    Принимает ISO дату/время или относительный интервал: 30m, 12h, 1d, 2w.
+    """
+    match = re.fullmatch(r"(\d+)([mhdw])", value.strip())
+    if match:
+        amount = int(match.group(1))
+        unit = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}[match.group(2)]
+        moment = datetime.now(timezone.utc) - timedelta(**{unit: amount})
+    else:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class DocumentRecord:
+    """Запись о документе, ожидающая сброса в каталог"""
+
+    path: str
+    source: str
+    sha256: str
+    size: int
+    url: str | None = None
+    fetched_at: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    sections: List[Tuple[int, str, int]] = field(default_factory=list)
+
+
+class DocsCatalog:
+    """
+    Каталог документов зеркала
+
+    Используется как контекстный менеджер: при выходе буфер
+    сбрасывается, соединение закрывается.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_CATALOG_PATH, batch_size: int = 200):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        # Запас на ожидание блокировки: в каталог могут писать несколько процессов
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.pending: List[DocumentRecord] = []
+        # Переименования (старый ключ, новый ключ) применяются в flush()
+        # перед записями документов
+        self.pending_renames: List[Tuple[str, str]] = []
+        self.closed = False
+        self._deferred = 0
+
+    def __enter__(self) -> "DocsCatalog":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Сбросить буфер и закрыть соединение (повторный вызов ничего не делает)"""
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+            self.closed = True
+
+    def record_document(
+        self,
+        path: Path,
+        source: str,
+        content: str | None = None,
+        url: str | None = None,
+        fetched_at: str | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """
+        Добавить или обновить документ (запись попадает в пакетный буфер)
+
+        Args:
+            path: Локальный путь к файлу
+            source: Имя источника (claude_code, codegen, r2r ...)
+            content: Содержимое; если не задано, читается с диска
+            url: URL, с которого загружен документ
+            fetched_at: Время загрузки (ISO 8601 UTC)
+            etag: Значение заголовка ETag
+            last_modified: Значение заголовка Last-Modified
+        """
+        if content is None:
+            content = Path(path).read_text(encoding="utf-8")
+        data = content.encode("utf-8")
+
+        self.pending.append(
+            DocumentRecord(
+                path=to_project_path(path),
+                source=source,
+                sha256=hashlib.sha256(data).hexdigest(),
+                size=len(data),
+                url=url,
+                fetched_at=fetched_at,
+                etag=etag,
+                last_modified=last_modified,
+                sections=parse_headings(content),
+            )
+        )
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        """Сбросить буфер, если он заполнен и запись не отложена"""
+        if not self._deferred and len(self.pending) + len(self.pending_renames) >= self.batch_size:
+            self.flush()
+
+    @contextmanager
+    def transaction(self) -> Iterator["DocsCatalog"]:
+        """
+        Отложить запись до успешного завершения внешней операции
+
+        Внутри блока буфер не сбрасывается автоматически. При исключении
+        накопленные записи отбрасываются, чтобы каталог не описывал файлы,
+        которые так и не попали на диск (например, после отката
+        StagedWriter). При успехе записи остаются в буфере до flush().
+        """
+        self._deferred += 1
+        try:
+            yield self
+        except BaseException:
+            self.pending.clear()
+            self.pending_renames.clear()
+            raise
+        finally:
+            self._deferred -= 1
+
+    def flush(self) -> None:
+        """Записать накопленные переименования и документы одной транзакцией"""
+        if not self.pending and not self.pending_renames:
+            return
+
+        now = utc_now()
+        with self.conn:
+            for old_key, new_key in self.pending_renames:
+                # Устаревшая запись по новому пути (файла уже нет на диске)
+                self.conn.execute("DELETE FROM documents WHERE path = ?", (new_key,))
+                self.conn.execute(
+                    "UPDATE documents SET path = ?, updated_at = ? WHERE path = ?",
+                    (new_key, now, old_key),
+                )
+            for record in self.pending:
+                self.conn.execute(
+                    UPSERT_DOCUMENT,
+                    (
+                        record.path,
+                        record.source,
+                        record.url,
+                        record.sha256,
+                        record.size,
+                        record.fetched_at,
+                        record.etag,
+                        record.last_modified,
+                        now,
+                        now,
+                    ),
+                )
+                self.conn.execute("DELETE FROM sections WHERE path = ?", (record.path,))
+                self.conn.executemany(
+                    "INSERT INTO sections (path, position, level, heading, line) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (record.path, position, level, heading, line)
+                        for position, (level, heading, line) in enumerate(record.sections)
+                    ],
+                )
+        self.pending.clear()
+        self.pending_renames.clear()
+
+    def rename_document(self, old_path: Path, new_path: Path) -> None:
+        """
+        Отразить переименование файла (запись попадает в пакетный буфер)
+
+        Оглавление переносится каскадно. Переименования применяются
+        в flush() раньше записей документов, поэтому ожидающие записи
+        старого пути переносятся на новый, а записи нового пути
+        (описывающие перезаписанный файл) отбрасываются.
+        """
+        old_key = to_project_path(old_path)
+        new_key = to_project_path(new_path)
+        self.pending = [record for record in self.pending if record.path != new_key]
+        for record in self.pending:
+            if record.path == old_key:
+                record.path = new_key
+        self.pending_renames.append((old_key, new_key))
+        self._maybe_flush()
+
+    def remove_missing(
+        self, source: str, existing: List[Path], directory: Path | None = None
+    ) -> int:
+        """
+        Удалить из каталога документы источника, которых больше нет на диске
+
+        Args:
+            source: Имя источника
+            existing: Файлы, которые есть на диске
+            directory: Проверять только документы внутри этой директории
+
+        Returns:
+            Количество удаленных записей
+        """
+        self.flush()
+        keep = {to_project_path(path) for path in existing}
+        prefix = to_project_path(directory) + "/" if directory is not None else ""
+        stale = [
+            path
+            for (path,) in self.conn.execute(
+                "SELECT path FROM documents WHERE source = ?", (source,)
+            )
+            if path.startswith(prefix) and path not in keep
+        ]
+        with self.conn:
+            self.conn.executemany("DELETE FROM documents WHERE path = ?", [(p,) for p in stale])
+        return len(stale)
+
+    def get_validators(self, path: Path) -> Tuple[str | None, str | None]:
+        """
+        Получить HTTP валидаторы документа для условного запроса
+
+        Returns:
+            Кортеж (etag, last_modified)
+        """
+        row = self.conn.execute(
+            "SELECT etag, last_modified FROM documents WHERE path = ?",
+            (to_project_path(path),),
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def changed_since(self, since: str) -> List[Tuple[str, str, int]]:
+        """Документы, содержимое которых изменилось после момента since"""
+        return list(
+            self.conn.execute(
+                "SELECT path, changed_at, size FROM documents "
+                "WHERE changed_at >= ? ORDER BY changed_at DESC",
+                (since,),
+            )
+        )
+
+    def larger_than(self, size: int) -> List[Tuple[str, int]]:
+        """Документы размером больше size байт"""
+        return list(
+            self.conn.execute(
+                "SELECT path, size FROM documents WHERE size > ? ORDER BY size DESC",
+                (size,),
+            )
+        )
+
+    def find_by_hash(self, sha256: str) -> List[str]:
+        """Пути документов с указанным хешем (поиск дубликатов)"""
+        return [
+            path
+            for (path,) in self.conn.execute(
+                "SELECT path FROM documents WHERE sha256 = ? ORDER BY path", (sha256,)
+            )
+        ]
+
+    def outline(self, path: Path) -> List[Tuple[int, str, int]]:
+        """Оглавление документа: (уровень, заголовок, строка)"""
+        return list(
+            self.conn.execute(
+                "SELECT level, heading, line FROM sections WHERE path = ? ORDER BY position",
+                (to_project_path(path),),
+            )
+        )
+
+    def summary(self) -> List[Tuple[str, int, int]]:
+        """Количество документов и суммарный размер по источникам"""
+        return list(
+            self.conn.execute(
+                "SELECT source, COUNT(*), SUM(size) FROM documents GROUP BY source ORDER BY source"
+            )
+        )
+
+
+def scan_docs(catalog: DocsCatalog, docs_dir: Path = DOCS_DIR) -> int:
+    """
+    Зарегистрировать в каталоге все файлы зеркала, уже лежащие на диске
+
+    Returns:
+        Количество просканированных файлов
+    """
+    files_by_source: dict = {}
+    for source, file_path in iter_doc_files(docs_dir):
+        catalog.record_document(file_path, source)
+        files_by_source.setdefault(source, []).append(file_path)
+
+    for source, files in files_by_source.items():
+        catalog.remove_missing(source, files)
+
+    return sum(len(files) for files in files_by_source.values())
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description="SQLite каталог зеркала документации")
+    parser.add_argument(
+        "--db",
+        default=str(DEFAULT_CATALOG_PATH),
+        help=f"Путь к каталогу (по умолчанию: {DEFAULT_CATALOG_PATH.relative_to(BASE_DIR)})",
+    )
+    parser.add_argument(
+        "--scan", action="store_true", help="Зарегистрировать все файлы из docs/"
+    )
+    parser.add_argument(
+        "--changed-since", help="Документы, изменившиеся с момента (ISO дата или 12h, 1d, 2w)"
+    )
+    parser.add_argument("--larger-than", type=float, help="Документы больше N КБ")
+    parser.add_argument("--hash", help="Документы с указанным SHA-256")
+    parser.add_argument("--outline", help="Оглавление документа по пути")
+
+    args = parser.parse_args()
+
+    with DocsCatalog(Path(args.db)) as catalog:
+        if args.scan:
+            count = scan_docs(catalog)
+            catalog.flush()
+            print(f"Просканировано файлов: {count}")
+
+        if args.changed_since:
+            since = parse_since(args.changed_since)
+            rows = catalog.changed_since(since)
+            print(f"\nИзменено с {since}: {len(rows)}")
+            for path, changed_at, size in rows:
+                print(f"  {changed_at}  {size:>8d}  {path}")
+
+        if args.larger_than is not None:
+            rows = catalog.larger_than(int(args.larger_than * 1024))
+            print(f"\nБольше {args.larger_than} КБ: {len(rows)}")
+            for path, size in rows:
+                print(f"  {size / 1024:>8.1f} КБ  {path}")
+
+        if args.hash:
+            for path in catalog.find_by_hash(args.hash):
+                print(f"  {path}")
+
+        if args.outline:
+            for level, heading, line in catalog.outline(Path(args.outline)):
+                print(f"  {line:>5d}  {'  ' * (level - 1)}{heading}")
+
+        print(f"\n{'='*60}")
+        print("КАТАЛОГ")
+        print(f"{'='*60}")
+        for source, count, size in catalog.summary():
+            print(f"  {source:20s} {count:>5d} файлов  {size / 1024:>10.1f} КБ")
+        print(f"{'='*60}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
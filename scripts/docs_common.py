@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Общие утилиты для скриптов работы с зеркалом документации
+
+Определяет набор источников (тот же, что создают загрузчики и
+split_r2r_docs.py), обход markdown файлов, ключи путей, хеширование
+содержимого, инкрементальное отслеживание файлов индексов и разбор
+заголовков.
+"""
+
+import hashlib
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+
+# Корень проекта (скрипт находится в scripts/)
+BASE_DIR = Path(__file__).parent.parent
+DOCS_DIR = BASE_DIR / "docs"
+
+# Директория для локальных индексов (не коммитится)
+INDEX_DIR = BASE_DIR / ".docs_index"
+
+# Источники зеркала: имя -> директория относительно docs/
+DEFAULT_SOURCES: Dict[str, str] = {
+    "claude_code": "claude_code",
+    "codegen": "codegen",
+    "r2r": "r2r",
+}
+
+
+def iter_doc_files(
+    docs_dir: Path = DOCS_DIR, sources: Dict[str, str] | None = None
+) -> Iterator[Tuple[str, Path]]:
+    """
+    Обойти все markdown файлы источников
+
+    Args:
+        docs_dir: Корневая директория документации
+        sources: Источники (имя -> поддиректория), по умолчанию DEFAULT_SOURCES
+
+    Yields:
+        Кортежи (имя источника, путь к файлу) в детерминированном порядке
+    """
+    for source, subdir in (sources or DEFAULT_SOURCES).items():
+        source_dir = docs_dir / subdir
+        if not source_dir.is_dir():
+            continue
+        for file_path in sorted(source_dir.rglob("*.md")):
+            if file_path.is_file():
+                yield source, file_path
+
+
+def to_project_path(path: Path, base_dir: Path = BASE_DIR) -> str:
+    """
+    Привести путь к ключу индексов и каталога
+
+    Пути внутри проекта хранятся относительно корня (docs/r2r/agent.md),
+    остальные - абсолютными.
+    """
+    resolved = Path(path).resolve()
+    try:
+        return resolved.relative_to(Path(base_dir).resolve()).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def file_sha256(file_path: Path) -> str:
+    """
+    Вычислить SHA-256 содержимого файла
+
+    Args:
+        file_path: Путь к файлу
+
+    Returns:
+        Hex-строка хеша
+    """
+    digest = hashlib.sha256()
+    with file_path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class TrackedFile:
+    """Новый или изменившийся файл, который нужно разобрать заново"""
+
+    path: Path
+    key: str
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+class FileTracker:
+    """
+    Инкрементальное отслеживание файлов индекса
+
+    Работает с таблицей files (path, mtime_ns, size, sha256) базы индекса.
+    Файл считается изменившимся, только если изменились mtime/размер
+    и при этом изменился хеш содержимого; если хеш тот же, в таблице
+    обновляются только mtime/размер. Запись строки files для
+    изменившегося файла остается за вызывающим кодом (вместе с его
+    зависимыми строками).
+
+    Args:
+        conn: Соединение с базой индекса
+        stats: Статистика вызывающего кода (обновляется счетчик unchanged)
+        base_dir: Корень для ключей путей
+    """
+
+    def __init__(self, conn: sqlite3.Connection, stats: dict, base_dir: Path = BASE_DIR):
+        self.conn = conn
+        self.stats = stats
+        self.base_dir = base_dir
+        self.known = {
+            row[0]: row[1:]
+            for row in conn.execute("SELECT path, mtime_ns, size, sha256 FROM files")
+        }
+        self.seen: Set[str] = set()
+
+    def check(self, file_path: Path) -> TrackedFile | None:
+        """
+        Проверить файл
+
+        Returns:
+            TrackedFile, если файл новый или изменился, иначе None
+        """
+        key = to_project_path(file_path, self.base_dir)
+        self.seen.add(key)
+        stat = file_path.stat()
+        previous = self.known.get(key)
+
+        if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+            self.stats["unchanged"] += 1
+            return None
+
+        sha256 = file_sha256(file_path)
+        if previous and previous[2] == sha256:
+            self.conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                (stat.st_mtime_ns, stat.st_size, key),
+            )
+            self.stats["unchanged"] += 1
+            return None
+
+        return TrackedFile(file_path, key, stat.st_mtime_ns, stat.st_size, sha256)
+
+    def removed(self) -> List[str]:
+        """Ключи файлов, которые есть в индексе, но не встретились при обходе"""
+        return sorted(set(self.known) - self.seen)
+
+
+HEADING_RE = re.compile(r"^ {0,3}(#{1,6})\s+(.+?)(?:\s+#+)?\s*$")
+# Открывающий fence с любым отступом: в зеркале Mintlify блоки кода часто
+# вложены в <Steps>, <Accordion> и <Tab> с отступом 4 и более пробелов
+FENCE_RE = re.compile(r"^([ \t]*)(`{3,}|~{3,})")
+
+
+def closes_fence(line: str, fence: str, indent: int) -> bool:
+    """
+    Проверить, закрывает ли строка открытый блок кода
+
+    Закрывающий fence состоит из того же символа, не короче открывающего
+    и имеет отступ не больше чем у открывающего плюс 3 пробела.
+
+    Args:
+        line: Строка внутри блока
+        fence: Открывающая последовательность (``` или ~~~)
+        indent: Отступ открывающего fence
+    """
+    stripped = line.strip()
+    return (
+        bool(stripped)
+        and set(stripped) == {fence[0]}
+        and len(stripped) >= len(fence)
+        and len(line) - len(line.lstrip(" \t")) <= indent + 3
+    )
+
+
+def parse_headings(content: str) -> List[Tuple[int, str, int]]:
+    """
+    Извлечь ATX заголовки markdown, пропуская блоки кода
+
+    Args:
+        content: Markdown контент
+
+    Returns:
+        Список кортежей (уровень, текст заголовка, номер строки с 1)
+    """
+    headings = []
+    fence = None
+    indent = 0
+
+    for lineno, line in enumerate(content.splitlines(), start=1):
+        if fence is None:
+            fence_match = FENCE_RE.match(line)
+            if fence_match:
+                indent = len(fence_match.group(1))
+                fence = fence_match.group(2)
+                continue
+            match = HEADING_RE.match(line)
+            if match:
+                headings.append((len(match.group(1)), match.group(2).strip(), lineno))
+        elif closes_fence(line, fence, indent):
+            fence = None
+
+    return headings
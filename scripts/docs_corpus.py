@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Библиотечный доступ к зеркалу документации
+
+DocsCorpus читает структуру, которую создают загрузчики,
+split_r2r_docs.py и rename_sections.py (docs/claude_code, docs/codegen,
+docs/r2r), без обращения к файлам напрямую:
+
+- список источников и документов строится по stat, без чтения содержимого;
+- содержимое читается при первом обращении через кратковременное mmap
+  отображение (закрывается сразу после копирования) и декодируется;
+- разобранные документы и оглавления хранятся в LRU кэше с лимитом по
+  объему памяти текста и оглавлений; запись инвалидируется при изменении
+  mtime/размера, и только тогда сравнивается хеш содержимого: если он
+  тот же, разобранные данные переиспользуются.
+
+Использование:
+    corpus = DocsCorpus()
+    for info in corpus.documents("claude_code"):
+        print(info.name, info.size)
+    doc = corpus.get("claude_code", "mcp")
+    print(doc.outline[:3])
+    print(corpus.section("claude_code", "mcp", "installing-mcp-servers"))
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from docs_common import DEFAULT_SOURCES, DOCS_DIR
+from heading_index import Heading, extract_headings, render_toc
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class DocumentInfo:
+    """Метаданные документа (без содержимого)"""
+
+    source: str
+    name: str
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+class Document:
+    """
+    Документ зеркала с ленивым содержимым
+
+    Файл читается при первом обращении к text или sha256; текст
+    и оглавление запоминаются до close(). После загрузки текста или
+    разбора оглавления вызывается on_load (так корпус учитывает
+    документ в лимите кэша).
+    """
+
+    def __init__(self, info: DocumentInfo, on_load: Callable[["Document"], None] | None = None):
+        self.info = info
+        self._on_load = on_load
+        self._text: str | None = None
+        self._sha256: str | None = None
+        self._outline: List[Heading] | None = None
+
+    @staticmethod
+    def _read(path: Path) -> bytes:
+        """
+        Прочитать файл через mmap
+
+        Отображение живет только на время копирования: обращение к живому
+        mmap файла, усеченного на месте, завершает процесс по SIGBUS.
+        Поэтому после отображения размер перепроверяется по fstat, а если
+        файл успели изменить - он читается обычным read().
+        """
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # Пустые файлы mmap не поддерживает
+            if size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapping:
+                if os.fstat(f.fileno()).st_size == size:
+                    return mapping[:]
+            f.seek(0)
+            return f.read()
+
+    def _load(self) -> Tuple[str, str]:
+        """
+        Прочитать файл: хеш и текст снимаются с одной и той же копии
+
+        Returns:
+            Кортеж (текст, sha256); значения возвращаются, а не только
+            запоминаются, потому что on_load может вытеснить и закрыть
+            этот же документ
+        """
+        data = self._read(self.info.path)
+        sha256 = hashlib.sha256(data).hexdigest()
+        text = data.decode("utf-8")
+        self._text, self._sha256 = text, sha256
+        if self._on_load is not None:
+            self._on_load(self)
+        return text, sha256
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 содержимого (того, из которого получен text)"""
+        sha256 = self._sha256
+        if sha256 is None:
+            _, sha256 = self._load()
+        return sha256
+
+    @property
+    def loaded(self) -> bool:
+        """Содержимое уже прочитано"""
+        return self._text is not None
+
+    @property
+    def text(self) -> str:
+        """Содержимое документа"""
+        text = self._text
+        if text is None:
+            text, _ = self._load()
+        return text
+
+    @property
+    def outline(self) -> List[Heading]:
+        """Заголовки документа с GitHub якорями"""
+        outline = self._outline
+        if outline is None:
+            outline = extract_headings(self.text, self.info.path.as_posix())
+            self._outline = outline
+            if self._on_load is not None:
+                self._on_load(self)
+        return outline
+
+    def adopt(self, other: "Document") -> None:
+        """Перенять разобранные данные документа с тем же содержимым"""
+        self._text, self._sha256, self._outline = other._text, other._sha256, other._outline
+
+    def memory_size(self) -> int:
+        """Примерный объем памяти загруженного текста и оглавления"""
+        text, outline = self._text, self._outline
+        size = sys.getsizeof(text) if text is not None else 0
+        if outline is not None:
+            size += sys.getsizeof(outline)
+            for heading in outline:
+                size += sys.getsizeof(heading) + sys.getsizeof(heading.__dict__)
+                size += sys.getsizeof(heading.text) + sys.getsizeof(heading.anchor)
+        return size
+
+    def toc(self, max_level: int = 3) -> str:
+        """Markdown оглавление документа"""
+        return render_toc(self.outline, max_level)
+
+    def section(self, anchor: str) -> str | None:
+        """
+        Текст раздела: от заголовка с якорем до следующего заголовка
+        того же или более высокого уровня
+
+        Args:
+            anchor: Якорь заголовка (с # или без)
+
+        Returns:
+            Текст раздела или None, если якорь не найден
+        """
+        anchor = anchor.lstrip("#")
+        headings = self.outline
+        for i, heading in enumerate(headings):
+            if heading.anchor != anchor:
+                continue
+            end_line = None
+            for following in headings[i + 1 :]:
+                if following.level <= heading.level:
+                    end_line = following.line
+                    break
+            lines = self.text.splitlines()
+            return "\n".join(lines[heading.line - 1 : (end_line - 1) if end_line else None]).strip()
+        return None
+
+    def close(self) -> None:
+        """Освободить загруженные данные (при обращении файл будет прочитан заново)"""
+        self._text = None
+        self._sha256 = None
+        self._outline = None
+
+
+class DocsCorpus:
+    """
+    Корпус документации с LRU кэшем разобранных документов
+
+    Потокобезопасен: кэш защищен блокировкой.
+
+    Args:
+        docs_dir: Корневая директория документации
+        sources: Источники (имя -> поддиректория), по умолчанию DEFAULT_SOURCES
+        cache_bytes: Лимит кэша по памяти загруженных текстов и оглавлений
+            (документ учитывается в момент загрузки текста и разбора
+            оглавления, в том числе вне методов корпуса)
+    """
+
+    def __init__(
+        self,
+        docs_dir: Path = DOCS_DIR,
+        sources: Dict[str, str] | None = None,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        self.docs_dir = Path(docs_dir)
+        self.source_dirs = {
+            name: self.docs_dir / subdir for name, subdir in (sources or DEFAULT_SOURCES).items()
+        }
+        self.cache_bytes = cache_bytes
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self._cache: "OrderedDict[Path, Document]" = OrderedDict()
+        self._charged: Dict[Path, int] = {}
+        self._cached_size = 0
+        self._lock = threading.RLock()
+
+    def sources(self) -> List[str]:
+        """Имена источников, директории которых существуют"""
+        return [name for name, path in self.source_dirs.items() if path.is_dir()]
+
+    def documents(self, source: str) -> List[DocumentInfo]:
+        """
+        Список документов источника (только stat, без чтения файлов)
+
+        Args:
+            source: Имя источника
+
+        Returns:
+            Документы, отсортированные по имени; имя - путь внутри
+            источника без расширения .md (например, api-reference/overview)
+        """
+        source_dir = self._source_dir(source)
+        result = []
+        for file_path in sorted(source_dir.rglob("*.md")):
+            relative = file_path.relative_to(source_dir)
+            if any(part.startswith(".") for part in relative.parts):
+                continue
+            stat = file_path.stat()
+            result.append(
+                DocumentInfo(
+                    source=source,
+                    name=relative.with_suffix("").as_posix(),
+                    path=file_path,
+                    size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns,
+                )
+            )
+        return result
+
+    def get(self, source: str, name: str) -> Document:
+        """
+        Получить документ (из кэша, если он не изменился на диске)
+
+        Args:
+            source: Имя источника
+            name: Имя документа (путь внутри источника, .md можно опустить)
+
+        Raises:
+            KeyError: Если источник неизвестен
+            FileNotFoundError: Если документа нет
+        """
+        source_dir = self._source_dir(source)
+        path = source_dir / (name if name.endswith(".md") else f"{name}.md")
+        # Имя приходит от вызывающего кода: не выпускаем за пределы источника
+        if not path.resolve().is_relative_to(source_dir.resolve()):
+            raise FileNotFoundError(f"Документ вне источника {source}: {name}")
+        stat = path.stat()
+        info = DocumentInfo(
+            source=source,
+            name=name.removesuffix(".md"),
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+        )
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None:
+                if (cached.info.mtime_ns, cached.info.size) == (info.mtime_ns, info.size):
+                    self._cache.move_to_end(path)
+                    self.stats["hits"] += 1
+                    return cached
+            cached_sha256 = cached._sha256 if cached is not None else None
+
+        # Чтение и хеширование - без блокировки, чтобы ревалидация одного
+        # документа не останавливала остальные потоки. Хеш считается только
+        # для изменившейся записи с загруженным текстом: иначе переиспользовать нечего
+        document = Document(info, on_load=self._charge_loaded)
+        revalidated = cached_sha256 is not None and cached_sha256 == document.sha256
+        if revalidated:
+            # Файл перезаписан тем же содержимым: переносим разобранные данные
+            document.adopt(cached)
+
+        with self._lock:
+            current = self._cache.get(path)
+            if (
+                current is not None
+                and current is not cached
+                and (current.info.mtime_ns, current.info.size) == (info.mtime_ns, info.size)
+            ):
+                # Другой поток уже загрузил эту версию
+                self._cache.move_to_end(path)
+                self.stats["hits"] += 1
+                return current
+
+            self.stats["revalidated" if revalidated else "misses"] += 1
+            self._store(path, document, replaced=current)
+            return document
+
+    def outline(self, source: str, name: str) -> List[Heading]:
+        """Оглавление документа (из кэша)"""
+        return self.get(source, name).outline
+
+    def section(self, source: str, name: str, anchor: str) -> str | None:
+        """Текст раздела документа по якорю"""
+        return self.get(source, name).section(anchor)
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        with self._lock:
+            for document in self._cache.values():
+                document.close()
+            self._cache.clear()
+            self._charged.clear()
+            self._cached_size = 0
+
+    def _source_dir(self, source: str) -> Path:
+        """Директория источника"""
+        if source not in self.source_dirs:
+            raise KeyError(f"Неизвестный источник: {source}")
+        return self.source_dirs[source]
+
+    def _store(self, path: Path, document: Document, replaced: Document | None) -> None:
+        """Положить документ в кэш вместо прежней версии"""
+        if replaced is not None:
+            self._cache.pop(path)
+            self._cached_size -= self._charged.pop(path)
+            replaced.close()
+
+        self._cache[path] = document
+        self._charged[path] = 0
+        self._charge(path, document)
+
+    def _charge_loaded(self, document: Document) -> None:
+        """Учесть документ после загрузки текста или оглавления (on_load)"""
+        with self._lock:
+            self._charge(document.info.path, document)
+
+    def _charge(self, path: Path, document: Document) -> None:
+        """Учесть текущий объем документа и вытеснить самые старые сверх лимита"""
+        if self._cache.get(path) is not document:
+            return
+        size = document.memory_size()
+        self._cached_size += size - self._charged[path]
+        self._charged[path] = size
+
+        while self._cached_size > self.cache_bytes and self._cache:
+            # Документ больше всего кэша вытесняется сам
+            evicted_path, evicted = self._cache.popitem(last=False)
+            self._cached_size -= self._charged.pop(evicted_path)
+            evicted.close()
+            self.stats["evictions"] += 1
+
+
+def main():
+    """Главная функция: просмотр корпуса из командной строки"""
+    parser = argparse.ArgumentParser(description="Просмотр зеркала документации")
+    parser.add_argument("source", nargs="?", help="Источник (claude_code, codegen, r2r)")
+    parser.add_argument("name", nargs="?", help="Документ внутри источника")
+    parser.add_argument("--section", help="Показать раздел по якорю")
+    parser.add_argument("--toc", action="store_true", help="Показать оглавление документа")
+
+    args = parser.parse_args()
+    corpus = DocsCorpus()
+
+    try:
+        if not args.source:
+            for source in corpus.sources():
+                docs = corpus.documents(source)
+                total = sum(info.size for info in docs)
+                print(f"  {source:20s} {len(docs):>5d} файлов  {total / 1024:>10.1f} КБ")
+            return 0
+
+        if not args.name:
+            for info in corpus.documents(args.source):
+                print(f"  {info.size:>8d}  {info.name}")
+            return 0
+
+        document = corpus.get(args.source, args.name)
+        if args.section:
+            text = document.section(args.section)
+            if text is None:
+                print(f"✗ Раздел не найден: {args.section}")
+                return 1
+            print(text)
+        elif args.toc:
+            print(document.toc(), end="")
+        else:
+            print(document.text)
+    except (KeyError, FileNotFoundError) as e:
+        print(f"❌ Ошибка: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@
 import logging
 import re
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 from urllib.parse import urlparse
 import time
@@ -20,6 +21,10 @@ except ImportError:
     print("Установите их: pip install requests tqdm")
     sys.exit(1)
 
+from docs_catalog import DEFAULT_CATALOG_PATH, DocsCatalog, utc_now
+from run_profiler import RunProfiler, add_profile_arguments
+from staged_writer import StagedWriter
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -39,9 +44,14 @@ class CodegenDocsDownloader:
         self,
         llms_txt_path: str = "docs/codegen/llms.txt",
         output_dir: str = "docs/codegen",
+        catalog: DocsCatalog | None = None,
+        profiler: RunProfiler | None = None,
     ):
         self.llms_txt_path = Path(llms_txt_path)
         self.output_dir = Path(output_dir)
+        self.catalog = catalog
+        self.profiler = profiler or RunProfiler(self.__class__.__name__)
+        self.writer: StagedWriter | None = None
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -87,6 +97,31 @@ class CodegenDocsDownloader:
         
         return self.output_dir / relative_path
 
+    def write_text(self, local_path: Path, content: str) -> None:
+        """Записать файл через транзакционный писатель (или напрямую вне загрузки)"""
+        if self.writer is not None:
+            self.writer.write_text(local_path, content)
+        else:
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            local_path.write_text(content, encoding="utf-8")
+
+    def conditional_headers(self, local_path: Path) -> dict:
+        """
+        Заголовки условного запроса из HTTP валидаторов каталога
+
+        Используются только если файл уже есть на диске, иначе
+        сервер может ответить 304 на отсутствующий файл.
+        """
+        if self.catalog is None or not local_path.exists():
+            return {}
+        etag, last_modified = self.catalog.get_validators(local_path)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
     def download_file(
         self, url: str, local_path: Path, overwrite: bool = False
     ) -> bool:
@@ -103,20 +138,37 @@ class CodegenDocsDownloader:
         """
         # Проверка существования файла
         if local_path.exists() and not overwrite:
+            if self.catalog is not None:
+                self.catalog.record_document(local_path, self.output_dir.name, url=url)
             logger.debug(f"Файл уже существует, пропускаем: {local_path}")
             self.stats["skipped"] += 1
             return True
 
-        # Создание директории если нужно
-        local_path.parent.mkdir(parents=True, exist_ok=True)
-
         try:
             logger.debug(f"Загрузка {url}")
-            response = self.session.get(url, timeout=30)
+            response = self.session.get(
+                url, headers=self.conditional_headers(local_path), timeout=30
+            )
             response.raise_for_status()
 
+            # Файл не изменился на сервере (условный запрос по ETag / Last-Modified)
+            if response.status_code == 304:
+                logger.debug(f"Не изменился, пропускаем: {local_path.name}")
+                self.stats["skipped"] += 1
+                return True
+
             # Сохранение файла
-            local_path.write_text(response.text, encoding="utf-8")
+            self.write_text(local_path, response.text)
+            if self.catalog is not None:
+                self.catalog.record_document(
+                    local_path,
+                    self.output_dir.name,
+                    response.text,
+                    url=url,
+                    fetched_at=utc_now(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
             logger.debug(f"✓ Сохранен: {local_path.relative_to(self.output_dir)} ({len(response.text)} байт)")
             self.stats["success"] += 1
             
@@ -153,7 +205,8 @@ class CodegenDocsDownloader:
         logger.info(f"Выходная директория: {self.output_dir.absolute()}")
 
         # Парсинг URL из llms.txt
-        urls = self.parse_markdown_urls()
+        with self.profiler.phase("parse_index"):
+            urls = self.parse_markdown_urls()
 
         if not urls:
             logger.error("Не найдено ни одного URL для загрузки")
@@ -162,11 +215,33 @@ class CodegenDocsDownloader:
         # Загрузка всех файлов с прогресс-баром
         logger.info(f"\nНачало загрузки {len(urls)} файлов...\n")
 
-        with tqdm(total=len(urls), desc="Загрузка документации", unit="файл") as pbar:
-            for url in urls:
-                local_path = self.get_local_path(url)
-                self.download_file(url, local_path, overwrite)
-                pbar.update(1)
+        # Файлы пишутся в staging-копию output_dir, которая подменяет
+        # живую директорию только после успешного завершения. Записи каталога
+        # (хеши, ETag) попадают в базу тоже только после commit: иначе
+        # следующий --overwrite получил бы 304 на откаченные файлы
+        deferred = self.catalog.transaction() if self.catalog is not None else nullcontext()
+        self.writer = StagedWriter(self.output_dir, keep_existing=True)
+        self.writer.begin()
+        try:
+            with deferred:
+                with self.profiler.phase("download"), tqdm(
+                    total=len(urls), desc="Загрузка документации", unit="файл"
+                ) as pbar:
+                    for url in urls:
+                        local_path = self.get_local_path(url)
+                        self.download_file(url, local_path, overwrite)
+                        pbar.update(1)
+
+                with self.profiler.phase("commit"):
+                    self.writer.commit()
+        except BaseException:
+            self.writer.rollback()
+            raise
+        finally:
+            self.writer = None
+
+        if self.catalog is not None:
+            self.catalog.flush()
 
         return (self.stats["success"], self.stats["failed"], self.stats["skipped"])
 
@@ -193,14 +268,32 @@ def main():
         action="store_true",
         help="Перезаписывать существующие файлы",
     )
+    parser.add_argument(
+        "--catalog",
+        default=str(DEFAULT_CATALOG_PATH),
+        help="Путь к SQLite каталогу документов (по умолчанию: .docs_index/catalog.sqlite3)",
+    )
+    parser.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="Не записывать метаданные в каталог",
+    )
+
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
+    profiler = RunProfiler.from_args(args, Path(__file__).stem)
+    catalog = None if args.no_catalog else DocsCatalog(Path(args.catalog))
 
     # Создание загрузчика и запуск
     downloader = CodegenDocsDownloader(
-        llms_txt_path=args.llms_txt, output_dir=args.output_dir
+        llms_txt_path=args.llms_txt,
+        output_dir=args.output_dir,
+        catalog=catalog,
+        profiler=profiler,
     )
 
+    exit_code = 1
     try:
         success, failed, skipped = downloader.download_all(overwrite=args.overwrite)
 
@@ -215,12 +308,20 @@ def main():
         print("=" * 60)
 
         # Код возврата
-        sys.exit(0 if failed == 0 else 1)
+        exit_code = 0 if failed == 0 else 1
+        sys.exit(exit_code)
 
     except Exception as e:
         logger.error(f"Критическая ошибка: {e}")
         sys.exit(1)
 
+    finally:
+        # Каталог закрывается на любом пути выхода, буфер сбрасывается
+        if catalog is not None:
+            with profiler.phase("catalog"):
+                catalog.close()
+        profiler.finish(exit_code)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Индекс примеров кода из зеркала документации
+
+Извлекает все fenced code blocks (``` и ~~~) из docs/claude_code,
+docs/codegen и docs/r2r вместе с языком, исходным файлом, ближайшим
+заголовком и диапазоном строк. Сниппеты хранятся в SQLite индексе,
+который обновляется инкрементально: повторно разбираются только
+изменившиеся файлы.
+
+Примеры:
+    python scripts/extract_code_snippets.py
+    python scripts/extract_code_snippets.py --lang bash --query "claude mcp"
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+from docs_common import (
+    BASE_DIR,
+    DOCS_DIR,
+    HEADING_RE,
+    INDEX_DIR,
+    FileTracker,
+    TrackedFile,
+    closes_fence,
+    iter_doc_files,
+)
+
+DEFAULT_DB_PATH = INDEX_DIR / "snippets.sqlite3"
+
+# Версия правил извлечения: при изменении индекс перестраивается целиком
+EXTRACTOR_VERSION = 3
+
+# Открывающий fence с тегом языка, отступ любой (заголовки разбираются
+# общим HEADING_RE)
+FENCE_RE = re.compile(r"^([ \t]*)(`{3,}|~{3,})\s*([^\s`{]*)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snippets (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    language TEXT NOT NULL,
+    heading TEXT,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    code TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snippets_language ON snippets(language);
+CREATE INDEX IF NOT EXISTS idx_snippets_path ON snippets(path);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS snippets_fts USING fts5(
+    code, heading, content='snippets', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS snippets_ai AFTER INSERT ON snippets BEGIN
+    INSERT INTO snippets_fts(rowid, code, heading)
+    VALUES (new.id, new.code, new.heading);
+END;
+CREATE TRIGGER IF NOT EXISTS snippets_ad AFTER DELETE ON snippets BEGIN
+    INSERT INTO snippets_fts(snippets_fts, rowid, code, heading)
+    VALUES ('delete', old.id, old.code, old.heading);
+END;
+"""
+
+
+@dataclass
+class Snippet:
+    """Один блок кода из документации"""
+
+    path: str
+    source: str
+    language: str
+    heading: str | None
+    start_line: int
+    end_line: int
+    code: str
+
+
+def extract_snippets(content: str, path: str, source: str) -> List[Snippet]:
+    """
+    Извлечь все fenced code blocks из markdown
+
+    Заголовки внутри блоков кода игнорируются. Блоки с отступом
+    (вложенные в <Steps>, <Tab> и т.п.) тоже извлекаются, отступ
+    открывающего fence снимается со строк кода. Незакрытый блок
+    продолжается до конца документа (как в CommonMark).
+
+    Args:
+        content: Markdown контент
+        path: Путь к файлу (для записи в сниппет)
+        source: Имя источника
+
+    Returns:
+        Список сниппетов в порядке появления
+    """
+    snippets = []
+    heading = None
+    fence = None
+    indent = 0
+    language = ""
+    start_line = 0
+    body: List[str] = []
+
+    lines = content.splitlines()
+    for lineno, line in enumerate(lines, start=1):
+        if fence is None:
+            match = FENCE_RE.match(line)
+            if match:
+                indent = len(match.group(1))
+                fence = match.group(2)
+                language = match.group(3).lower()
+                start_line = lineno
+                body = []
+                continue
+            heading_match = HEADING_RE.match(line)
+            if heading_match:
+                heading = heading_match.group(2).strip()
+            continue
+
+        if closes_fence(line, fence, indent):
+            snippets.append(
+                Snippet(path, source, language, heading, start_line, lineno, "\n".join(body))
+            )
+            fence = None
+        else:
+            # Снимаем с кода отступ открывающего fence (не больше, чем есть)
+            body.append(line[min(indent, len(line) - len(line.lstrip(" \t"))) :])
+
+    if fence is not None:
+        snippets.append(
+            Snippet(path, source, language, heading, start_line, len(lines), "\n".join(body))
+        )
+
+    return snippets
+
+
+class SnippetIndex:
+    """SQLite индекс сниппетов с инкрементальным обновлением"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.has_fts = self._init_fts()
+        self._check_version()
+        self.stats = {"indexed": 0, "unchanged": 0, "removed": 0, "snippets": 0}
+
+    def _init_fts(self) -> bool:
+        """Создать полнотекстовый индекс, если SQLite собран с FTS5"""
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def _check_version(self) -> None:
+        """Сбросить индекс, если он построен другой версией правил извлечения"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == EXTRACTOR_VERSION:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM snippets")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute(f"PRAGMA user_version = {EXTRACTOR_VERSION}")
+
+    def close(self) -> None:
+        """Закрыть соединение с базой"""
+        self.conn.close()
+
+    def update(self, docs_dir: Path = DOCS_DIR, base_dir: Path = BASE_DIR) -> dict:
+        """
+        Инкрементально обновить индекс по текущему набору файлов
+
+        Файл разбирается заново, только если изменились mtime/размер
+        и при этом изменился хеш содержимого.
+
+        Returns:
+            Статистика обновления
+        """
+        tracker = FileTracker(self.conn, self.stats, base_dir)
+
+        with self.conn:
+            for source, file_path in iter_doc_files(docs_dir):
+                changed = tracker.check(file_path)
+                if changed is None:
+                    continue
+                self._reindex_file(source, changed)
+                self.stats["indexed"] += 1
+
+            for rel_path in tracker.removed():
+                self.conn.execute("DELETE FROM snippets WHERE path = ?", (rel_path,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+                self.stats["removed"] += 1
+
+        self.stats["snippets"] = self.conn.execute("SELECT COUNT(*) FROM snippets").fetchone()[0]
+        return self.stats
+
+    def _reindex_file(self, source: str, changed: TrackedFile) -> None:
+        """Заменить сниппеты одного файла"""
+        content = changed.path.read_text(encoding="utf-8")
+        self.conn.execute("DELETE FROM snippets WHERE path = ?", (changed.key,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, source, mtime_ns, size, sha256) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (changed.key, source, changed.mtime_ns, changed.size, changed.sha256),
+        )
+        self.conn.executemany(
+            "INSERT INTO snippets (path, source, language, heading, start_line, end_line, code) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (s.path, s.source, s.language, s.heading, s.start_line, s.end_line, s.code)
+                for s in extract_snippets(content, changed.key, source)
+            ],
+        )
+
+    def search(
+        self,
+        language: str | None = None,
+        query: str | None = None,
+        source: str | None = None,
+        limit: int = 20,
+    ) -> List[Snippet]:
+        """
+        Найти сниппеты по языку, источнику и ключевым словам
+
+        Args:
+            language: Язык блока (тег после ```), без учета регистра
+            query: Ключевые слова (все должны встречаться в коде или заголовке)
+            source: Имя источника
+            limit: Максимальное количество результатов
+
+        Returns:
+            Список найденных сниппетов
+        """
+        sql = (
+            "SELECT s.path, s.source, s.language, s.heading, s.start_line, s.end_line, s.code "
+            "FROM snippets s"
+        )
+        where = []
+        params: list = []
+
+        if query and self.has_fts:
+            sql += " JOIN snippets_fts f ON f.rowid = s.id"
+            terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+            where.append("snippets_fts MATCH ?")
+            params.append(" ".join(terms))
+        elif query:
+            for term in query.split():
+                where.append("(s.code LIKE ? OR s.heading LIKE ?)")
+                params.extend([f"%{term}%", f"%{term}%"])
+
+        if language:
+            where.append("s.language = ?")
+            params.append(language.lower())
+        if source:
+            where.append("s.source = ?")
+            params.append(source)
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.path, s.start_line LIMIT ?"
+        params.append(limit)
+
+        return [Snippet(*row) for row in self.conn.execute(sql, params)]
+
+    def languages(self) -> List[Tuple[str, int]]:
+        """Список языков с количеством сниппетов"""
+        return list(
+            self.conn.execute(
+                "SELECT language, COUNT(*) FROM snippets GROUP BY language ORDER BY COUNT(*) DESC"
+            )
+        )
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(
+        description="Индекс примеров кода из документации"
+    )
+    parser.add_argument(
+        "--db",
+        default=str(DEFAULT_DB_PATH),
+        help=f"Путь к базе индекса (по умолчанию: {DEFAULT_DB_PATH.relative_to(BASE_DIR)})",
+    )
+    parser.add_argument("--lang", help="Фильтр по языку блока (bash, json, python ...)")
+    parser.add_argument("--query", help="Ключевые слова для поиска")
+    parser.add_argument("--source", help="Фильтр по источнику (claude_code, codegen, r2r)")
+    parser.add_argument("--limit", type=int, default=20, help="Максимум результатов")
+    parser.add_argument(
+        "--languages", action="store_true", help="Показать статистику по языкам"
+    )
+    parser.add_argument(
+        "--no-update", action="store_true", help="Не обновлять индекс перед поиском"
+    )
+
+    args = parser.parse_args()
+
+    index = SnippetIndex(Path(args.db))
+    try:
+        if not args.no_update:
+            stats = index.update()
+            print(
+                f"Индекс обновлен: разобрано {stats['indexed']}, "
+                f"без изменений {stats['unchanged']}, удалено {stats['removed']}, "
+                f"сниппетов {stats['snippets']}"
+            )
+
+        if args.languages:
+            for language, count in index.languages():
+                print(f"  {language or '(без языка)':20s} {count:>6d}")
+
+        if args.lang or args.query or args.source:
+            results = index.search(args.lang, args.query, args.source, args.limit)
+            print(f"\nНайдено сниппетов: {len(results)}\n")
+            for snippet in results:
+                print(f"{'='*60}")
+                print(
+                    f"{snippet.path}:{snippet.start_line}-{snippet.end_line} "
+                    f"[{snippet.language or '-'}] {snippet.heading or ''}"
+                )
+                print(f"{'-'*60}")
+                print(snippet.code)
+    finally:
+        index.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Индекс заголовков и якорей всей документации docs/
+
+Хранит каждый заголовок каждого markdown файла в docs/ с уровнем,
+строкой и якорем, совместимым с GitHub (тот же алгоритм, что и
+github-slugger, включая суффиксы -1, -2 для повторов). Позволяет
+разрешать ссылки вида file.md#anchor, искать заголовки по префиксу
+и строить оглавления без повторного разбора файлов.
+
+Индекс обновляется инкрементально по хешам содержимого.
+
+Примеры:
+    python scripts/heading_index.py --prefix "install"
+    python scripts/heading_index.py --anchor "option-1-add-a-remote-http-server"
+    python scripts/heading_index.py --toc docs/claude_code/mcp.md --max-level 3
+    python scripts/heading_index.py --resolve "docs/claude_code/mcp.md#installing-mcp-servers"
+"""
+
+import argparse
+import html
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from docs_common import (
+    BASE_DIR,
+    DOCS_DIR,
+    INDEX_DIR,
+    FileTracker,
+    parse_headings,
+    to_project_path,
+)
+
+DEFAULT_DB_PATH = INDEX_DIR / "headings.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS headings (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    text_lower TEXT NOT NULL,
+    anchor TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (path, position)
+);
+CREATE INDEX IF NOT EXISTS idx_headings_anchor ON headings(anchor);
+CREATE INDEX IF NOT EXISTS idx_headings_text_lower ON headings(text_lower);
+"""
+
+# Версия правил построения якорей: при изменении индекс перестраивается целиком
+INDEX_VERSION = 3
+
+# Inline разметка, которую GitHub не включает в текст заголовка
+CODE_SPAN_RE = re.compile(r"(?<!`)(`+)(?!`)(.+?)(?<!`)\1(?!`)")
+ESCAPE_RE = re.compile(r"\\([!-/:-@\[-`{-~])")
+IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+# Пары выделения: открывающий разделитель не перед пробелом, закрывающий
+# не после пробела; "_" внутри слова (snake_case) выделением не считается
+STAR_EMPHASIS_RE = re.compile(r"(?<!\*)(\*{1,3})(?=[^\s*])(.+?)(?<=[^\s*])\1(?!\*)")
+UNDERSCORE_EMPHASIS_RE = re.compile(r"(?<!\w)(_{1,3})(?=[^\s_])(.+?)(?<=[^\s_])\1(?!\w)")
+# Заглушки для защищенных фрагментов: \x00 не входит в \w, поэтому
+# не влияет на разбор выделения вокруг них
+PLACEHOLDER_RE = re.compile("\x00(\\d+)\x00")
+
+
+def heading_text(raw: str) -> str:
+    """
+    Получить текст заголовка так, как его видит GitHub после рендеринга
+
+    Содержимое `кода` и экранированные символы сохраняются как есть,
+    ссылки и картинки заменяются своим текстом, HTML теги удаляются,
+    HTML сущности декодируются, а символы выделения убираются только
+    у парных разделителей (foo_bar_ остается без изменений).
+
+    Args:
+        raw: Исходный текст заголовка в markdown
+
+    Returns:
+        Отрендеренный текст заголовка
+    """
+    protected: List[str] = []
+
+    def protect(value: str) -> str:
+        protected.append(value)
+        return f"\x00{len(protected) - 1}\x00"
+
+    def restore(match: re.Match) -> str:
+        index = int(match.group(1))
+        return protected[index] if index < len(protected) else match.group(0)
+
+    def code_span(match: re.Match) -> str:
+        code = match.group(2)
+        # CommonMark: по одному пробелу с краев снимается, если они есть с обеих сторон
+        if len(code) > 2 and code.startswith(" ") and code.endswith(" ") and code.strip():
+            code = code[1:-1]
+        return protect(code)
+
+    # CommonMark заменяет U+0000 на U+FFFD, так что заглушки не пересекаются с текстом
+    text = CODE_SPAN_RE.sub(code_span, raw.replace("\x00", "\ufffd"))
+    text = ESCAPE_RE.sub(lambda match: protect(match.group(1)), text)
+    text = IMAGE_RE.sub(r"\1", text)
+    text = LINK_RE.sub(r"\1", text)
+    text = HTML_TAG_RE.sub("", text)
+
+    # Вложенное выделение (**_текст_**) снимается за несколько проходов
+    previous = None
+    while previous != text:
+        previous = text
+        text = STAR_EMPHASIS_RE.sub(r"\2", text)
+        text = UNDERSCORE_EMPHASIS_RE.sub(r"\2", text)
+
+    text = html.unescape(text)
+    text = PLACEHOLDER_RE.sub(restore, text)
+    return text.strip()
+
+
+def github_slug(text: str, seen: Dict[str, int] | None = None) -> str:
+    """
+    Создать якорь заголовка по правилам GitHub
+
+    Текст приводится к нижнему регистру, удаляется все, кроме букв,
+    цифр, подчеркиваний, дефисов и пробелов, пробелы заменяются на
+    дефисы (без схлопывания). Повторяющиеся якоря в одном документе
+    получают суффиксы -1, -2, ...
+
+    Args:
+        text: Отрендеренный текст заголовка (см. heading_text)
+        seen: Счетчик уже выданных якорей документа (изменяется)
+
+    Returns:
+        Якорь без символа #
+    """
+    slug = re.sub(r"[^\w\- ]", "", text.lower()).replace(" ", "-")
+    if seen is None:
+        return slug
+
+    base = slug
+    while slug in seen:
+        seen[base] += 1
+        slug = f"{base}-{seen[base]}"
+    seen.setdefault(base, 0)
+    seen.setdefault(slug, 0)
+    return slug
+
+
+@dataclass
+class Heading:
+    """Заголовок документа с якорем"""
+
+    path: str
+    level: int
+    text: str
+    anchor: str
+    line: int
+
+
+def extract_headings(content: str, path: str) -> List[Heading]:
+    """
+    Извлечь заголовки документа с GitHub якорями
+
+    Args:
+        content: Markdown контент
+        path: Путь к файлу (для записи в заголовок)
+
+    Returns:
+        Заголовки в порядке появления
+    """
+    seen: Dict[str, int] = {}
+    result = []
+    for level, raw, line in parse_headings(content):
+        text = heading_text(raw)
+        result.append(Heading(path, level, text, github_slug(text, seen), line))
+    return result
+
+
+def iter_markdown_files(docs_dir: Path = DOCS_DIR) -> Iterator[Path]:
+    """Все markdown файлы docs/, кроме скрытых (staging-директории и т.п.)"""
+    for file_path in sorted(docs_dir.rglob("*.md")):
+        relative = file_path.relative_to(docs_dir)
+        if file_path.is_file() and not any(part.startswith(".") for part in relative.parts):
+            yield file_path
+
+
+def render_toc(headings: List[Heading], max_level: int = 6, min_level: int | None = None) -> str:
+    """
+    Построить markdown оглавление
+
+    Args:
+        headings: Заголовки одного документа
+        max_level: Максимальный уровень заголовков в оглавлении
+        min_level: Уровень верхних пунктов (по умолчанию - минимальный из найденных)
+
+    Returns:
+        Список markdown ссылок с отступами по уровню
+    """
+    selected = [h for h in headings if h.level <= max_level]
+    if not selected:
+        return ""
+    top = min_level or min(h.level for h in selected)
+    return "\n".join(
+        f"{'  ' * (h.level - top)}- [{h.text}](#{h.anchor})"
+        for h in selected
+        if h.level >= top
+    ) + "\n"
+
+
+class HeadingIndex:
+    """Персистентный индекс заголовков docs/"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._check_version()
+        self.stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+
+    def __enter__(self) -> "HeadingIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _check_version(self) -> None:
+        """Сбросить индекс, если он построен другой версией правил якорей"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == INDEX_VERSION:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM headings")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    def close(self) -> None:
+        """Закрыть соединение с базой"""
+        self.conn.close()
+
+    def update(self, docs_dir: Path = DOCS_DIR, base_dir: Path = BASE_DIR) -> dict:
+        """
+        Инкрементально обновить индекс
+
+        Файл разбирается заново, только если изменились mtime/размер
+        и при этом изменился хеш содержимого.
+
+        Returns:
+            Статистика обновления
+        """
+        self.stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+        tracker = FileTracker(self.conn, self.stats, base_dir)
+
+        with self.conn:
+            for file_path in iter_markdown_files(docs_dir):
+                changed = tracker.check(file_path)
+                if changed is None:
+                    continue
+
+                content = file_path.read_text(encoding="utf-8")
+                self.conn.execute("DELETE FROM headings WHERE path = ?", (changed.key,))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+                    (changed.key, changed.mtime_ns, changed.size, changed.sha256),
+                )
+                self.conn.executemany(
+                    "INSERT INTO headings (path, position, level, text, text_lower, anchor, line) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (changed.key, position, h.level, h.text, h.text.lower(), h.anchor, h.line)
+                        for position, h in enumerate(extract_headings(content, changed.key))
+                    ],
+                )
+                self.stats["indexed"] += 1
+
+            for rel_path in tracker.removed():
+                self.conn.execute("DELETE FROM headings WHERE path = ?", (rel_path,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+                self.stats["removed"] += 1
+
+        return self.stats
+
+    def _select(self, where: str, params: tuple, limit: int | None = None) -> List[Heading]:
+        """Выполнить выборку заголовков"""
+        sql = f"SELECT path, level, text, anchor, line FROM headings WHERE {where} ORDER BY path, position"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [Heading(*row) for row in self.conn.execute(sql, params)]
+
+    def by_anchor(self, anchor: str, path: str | None = None) -> List[Heading]:
+        """
+        Найти заголовки по якорю
+
+        Args:
+            anchor: Якорь (с # или без)
+            path: Ограничить поиск одним файлом
+
+        Returns:
+            Найденные заголовки
+        """
+        anchor = anchor.lstrip("#")
+        if path is not None:
+            return self._select("anchor = ? AND path = ?", (anchor, path))
+        return self._select("anchor = ?", (anchor,))
+
+    def by_prefix(self, prefix: str, limit: int = 50) -> List[Heading]:
+        """Найти заголовки, текст которых начинается с prefix (без учета регистра)"""
+        low = prefix.lower()
+        # Диапазон вместо LIKE, чтобы использовался индекс text_lower
+        return self._select(
+            "text_lower >= ? AND text_lower < ?", (low, low + "\U0010ffff"), limit
+        )
+
+    def headings(self, path: str) -> List[Heading]:
+        """Все заголовки файла в порядке появления"""
+        return self._select("path = ?", (path,))
+
+    def resolve(self, reference: str) -> Heading | None:
+        """
+        Разрешить ссылку вида docs/file.md#anchor
+
+        Returns:
+            Заголовок или None, если файла/якоря нет в индексе
+        """
+        path, _, anchor = reference.partition("#")
+        if not anchor:
+            found = self.headings(path)
+            return found[0] if found else None
+        found = self.by_anchor(anchor, path)
+        return found[0] if found else None
+
+    def toc(self, path: str, max_level: int = 6) -> str:
+        """Оглавление файла из индекса (без чтения файла)"""
+        return render_toc(self.headings(path), max_level)
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description="Индекс заголовков и якорей docs/")
+    parser.add_argument(
+        "--db",
+        default=str(DEFAULT_DB_PATH),
+        help=f"Путь к базе индекса (по умолчанию: {DEFAULT_DB_PATH.relative_to(BASE_DIR)})",
+    )
+    parser.add_argument("--anchor", help="Найти заголовки по якорю")
+    parser.add_argument("--prefix", help="Найти заголовки по началу текста")
+    parser.add_argument("--toc", help="Построить оглавление файла")
+    parser.add_argument("--max-level", type=int, default=3, help="Глубина оглавления")
+    parser.add_argument("--resolve", help="Разрешить ссылку path.md#anchor")
+    parser.add_argument(
+        "--no-update", action="store_true", help="Не обновлять индекс перед запросом"
+    )
+
+    args = parser.parse_args()
+
+    with HeadingIndex(Path(args.db)) as index:
+        if not args.no_update:
+            stats = index.update()
+            print(
+                f"Индекс обновлен: разобрано {stats['indexed']}, "
+                f"без изменений {stats['unchanged']}, удалено {stats['removed']}"
+            )
+
+        found: List[Heading] = []
+        if args.anchor:
+            found += index.by_anchor(args.anchor)
+        if args.prefix:
+            found += index.by_prefix(args.prefix)
+        for heading in found:
+            print(f"  {heading.path}:{heading.line}  {'#' * heading.level} {heading.text}  #{heading.anchor}")
+
+        if args.resolve:
+            path, _, anchor = args.resolve.partition("#")
+            reference = to_project_path(path) + (f"#{anchor}" if anchor else "")
+            heading = index.resolve(reference)
+            if heading is None:
+                print(f"✗ Не найдено: {args.resolve}")
+                return 1
+            print(f"✓ {heading.path}:{heading.line}  {heading.text}")
+
+        if args.toc:
+            print(index.toc(to_project_path(args.toc), args.max_level), end="")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """Быстрое переименование section-NN.md файлов на основе их содержимого"""
 
+import argparse
 import re
+from contextlib import nullcontext
 from pathlib import Path
 
+from docs_catalog import DEFAULT_CATALOG_PATH, DocsCatalog
+from run_profiler import RunProfiler, add_profile_arguments
+
 
 def slugify(text: str) -> str:
     """Создать slug из текста"""
@@ -24,37 +29,69 @@ def extract_heading(content: str) -> str | None:
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Переименование section-NN.md файлов по заголовкам"
+    )
+    parser.add_argument(
+        "--catalog",
+        default=str(DEFAULT_CATALOG_PATH),
+        help="Путь к SQLite каталогу документов (по умолчанию: .docs_index/catalog.sqlite3)",
+    )
+    parser.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="Не записывать метаданные в каталог",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler = RunProfiler.from_args(args, "rename_sections")
+
     docs_dir = Path(__file__).parent.parent / "docs" / "r2r"
     section_files = sorted(docs_dir.glob("section-*.md"))
 
     print(f"\nНайдено {len(section_files)} файлов для переименования\n")
 
-    renamed = 0
-    for file_path in section_files:
-        content = file_path.read_text(encoding="utf-8")
-        heading = extract_heading(content)
-
-        if not heading:
-            print(f"⊘ {file_path.name} - заголовок не найден")
-            continue
-
-        slug = slugify(heading)
-        new_name = f"{slug}.md"
-        new_path = file_path.parent / new_name
-
-        if new_path.exists() and new_path != file_path:
-            # Добавляем суффикс если файл уже существует
-            counter = 2
-            while (file_path.parent / f"{slug}-{counter}.md").exists():
-                counter += 1
-            new_name = f"{slug}-{counter}.md"
-            new_path = file_path.parent / new_name
-
-        file_path.rename(new_path)
-        print(f"✓ {file_path.name:30s} -> {new_name}")
-        renamed += 1
-
-    print(f"\n✅ Переименовано: {renamed} файлов\n")
+    exit_code = 1
+    try:
+        renamed = 0
+        catalog_context = nullcontext() if args.no_catalog else DocsCatalog(Path(args.catalog))
+        with catalog_context as catalog:
+            with profiler.phase("rename"):
+                for file_path in section_files:
+                    content = file_path.read_text(encoding="utf-8")
+                    heading = extract_heading(content)
+
+                    if not heading:
+                        print(f"⊘ {file_path.name} - заголовок не найден")
+                        continue
+
+                    slug = slugify(heading)
+                    new_name = f"{slug}.md"
+                    new_path = file_path.parent / new_name
+
+                    if new_path.exists() and new_path != file_path:
+                        # Добавляем суффикс если файл уже существует
+                        counter = 2
+                        while (file_path.parent / f"{slug}-{counter}.md").exists():
+                            counter += 1
+                        new_name = f"{slug}-{counter}.md"
+                        new_path = file_path.parent / new_name
+
+                    file_path.rename(new_path)
+                    if catalog is not None:
+                        catalog.rename_document(file_path, new_path)
+                        catalog.record_document(new_path, docs_dir.name, content)
+                    print(f"✓ {file_path.name:30s} -> {new_name}")
+                    renamed += 1
+
+            if catalog is not None:
+                with profiler.phase("catalog"):
+                    catalog.flush()
+
+        print(f"\n✅ Переименовано: {renamed} файлов\n")
+        exit_code = 0
+    finally:
+        profiler.finish(exit_code)
 
 
 if __name__ == "__main__":
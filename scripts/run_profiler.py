@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Профилирование запусков скриптов документации
+
+Для каждой фазы (разбор, запись, индекс, загрузка ...) записывает
+wall-clock и CPU время. С --profile-memory дополнительно включается
+tracemalloc и записывается пиковое выделение памяти по фазам; трассировка
+заметно замедляет запуск, поэтому по умолчанию выключена, а режим
+указывается в отчете. Результат сохраняется в JSON отчет, чтобы запуски
+можно было сравнивать между собой. Опционально весь запуск пишется
+в cProfile дамп (.prof), совместимый с pstats, snakeviz и flameprof.
+
+Использование в скрипте:
+    profiler = RunProfiler.from_args(args, "split_r2r_docs")
+    with profiler.phase("split"):
+        ...
+    profiler.finish(exit_code)  # в finally, чтобы отчет был и у неудачных запусков
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List
+
+from docs_common import INDEX_DIR
+
+PROFILES_DIR = INDEX_DIR / "profiles"
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Добавить в парсер аргументы --profile, --profile-memory и --profile-cprofile"""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="REPORT.json",
+        help="Профилировать фазы запуска и записать JSON отчет "
+        "(по умолчанию: .docs_index/profiles/<скрипт>-<время>.json)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Добавить в отчет пиковую память фаз (tracemalloc, замедляет запуск)",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        metavar="DUMP.prof",
+        help="Дополнительно записать cProfile дамп всего запуска",
+    )
+
+
+class RunProfiler:
+    """
+    Профилировщик фаз запуска
+
+    Если профилирование выключено, phase() ничего не измеряет,
+    поэтому вызовы можно оставлять в коде безусловно. Фазы не
+    должны быть вложенными: при trace_memory пик tracemalloc
+    сбрасывается в начале каждой фазы.
+    """
+
+    def __init__(
+        self,
+        script: str,
+        enabled: bool = False,
+        report_path: Path | None = None,
+        cprofile_path: Path | None = None,
+        trace_memory: bool = False,
+    ):
+        self.script = script
+        self.enabled = enabled or cprofile_path is not None
+        self.trace_memory = self.enabled and trace_memory
+        self.report_path = report_path
+        self.cprofile_path = cprofile_path
+        self.phases: List[dict] = []
+        # Задания, выполненные в дочерних процессах (со своими фазами)
+        self.jobs: List[dict] = []
+        self.started_at = datetime.now(timezone.utc)
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._children_cpu_start = self._children_cpu()
+        self._cprofile = None
+        self._finished = False
+
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.cprofile_path is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace, script: str) -> "RunProfiler":
+        """Создать профилировщик по аргументам из add_profile_arguments"""
+        report_path = None
+        if args.profile is not None:
+            report_path = Path(args.profile) if args.profile else None
+        cprofile_path = Path(args.profile_cprofile) if args.profile_cprofile else None
+        profiler = cls(
+            script,
+            enabled=args.profile is not None,
+            report_path=report_path,
+            cprofile_path=cprofile_path,
+            trace_memory=args.profile_memory,
+        )
+        if profiler.enabled and profiler.report_path is None:
+            stamp = profiler.started_at.strftime("%Y%m%dT%H%M%SZ")
+            profiler.report_path = PROFILES_DIR / f"{script}-{stamp}.json"
+        return profiler
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Измерить фазу запуска"""
+        if not self.enabled:
+            yield
+            return
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            current_start, _ = tracemalloc.get_traced_memory()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            item = {"name": name, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6)}
+            if self.trace_memory:
+                current_end, peak = tracemalloc.get_traced_memory()
+                item["peak_alloc_bytes"] = max(peak - current_start, 0)
+                item["net_alloc_bytes"] = current_end - current_start
+            self.phases.append(item)
+
+    def add_job(self, name: str, wall_s: float, cpu_s: float, phases: List[dict]) -> None:
+        """
+        Добавить в отчет задание, выполненное в другом процессе
+
+        process_time() текущего процесса не учитывает CPU дочерних
+        процессов, поэтому их фазы замеряются на месте и передаются сюда.
+        """
+        if self.enabled:
+            self.jobs.append({"name": name, "wall_s": wall_s, "cpu_s": cpu_s, "phases": phases})
+
+    @staticmethod
+    def _children_cpu() -> float:
+        """CPU время завершившихся дочерних процессов"""
+        times = os.times()
+        return times.children_user + times.children_system
+
+    def finish(self, exit_code: int = 0) -> Path | None:
+        """
+        Остановить профилирование и записать отчет
+
+        Повторный вызов ничего не делает, поэтому finish() можно
+        вызывать из finally.
+
+        Returns:
+            Путь к JSON отчету или None, если профилирование выключено
+        """
+        if not self.enabled or self._finished:
+            return None
+        self._finished = True
+
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        children_cpu = self._children_cpu() - self._children_cpu_start
+        total = {
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "children_cpu_s": round(children_cpu, 6),
+        }
+        if self.trace_memory:
+            total["peak_alloc_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.cprofile_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cprofile.dump_stats(self.cprofile_path)
+            print(f"cProfile дамп: {self.cprofile_path}")
+
+        if self.report_path is None:
+            return None
+
+        report = {
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "started_at": self.started_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "exit_code": exit_code,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            # Тайминги с tracemalloc/cProfile несравнимы с таймингами без них
+            "mode": "+".join(
+                ["timing"]
+                + (["tracemalloc"] if self.trace_memory else [])
+                + (["cprofile"] if self._cprofile is not None else [])
+            ),
+            "memory_tracing": self.trace_memory,
+            "total": total,
+            "phases": self.phases,
+            "jobs": self.jobs,
+            "cprofile": str(self.cprofile_path) if self.cprofile_path else None,
+        }
+
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+        print(f"\n{'='*60}")
+        print(f"ПРОФИЛЬ: {self.script}")
+        print(f"{'='*60}")
+        for item in self.phases:
+            line = f"  {item['name']:20s} wall {item['wall_s']:>9.3f} с  cpu {item['cpu_s']:>9.3f} с"
+            if "peak_alloc_bytes" in item:
+                line += f"  peak {item['peak_alloc_bytes'] / 1024:>10.1f} КБ"
+            print(line)
+        for job in self.jobs:
+            print(f"  {job['name']}  (wall {job['wall_s']:.3f} с, cpu {job['cpu_s']:.3f} с)")
+            for item in job["phases"]:
+                print(f"    {item['name']:18s} wall {item['wall_s']:>9.3f} с  cpu {item['cpu_s']:>9.3f} с")
+        print(f"  {'ИТОГО':20s} wall {wall:>9.3f} с  cpu {cpu:>9.3f} с")
+        if children_cpu:
+            print(f"  {'дочерние процессы':20s} {'':15s} cpu {children_cpu:>9.3f} с")
+        print(f"📄 Отчет: {self.report_path}")
+        print(f"{'='*60}\n")
+        return self.report_path
@@ -1,14 +1,37 @@
 #!/usr/bin/env python3
 """
-Скрипт для разделения документации R2R из llms.txt на отдельные файлы
-
-Читает файл docs/llms.txt, разделяет его по заголовкам уровня 2 (##)
-и сохраняет каждую часть в отдельный файл с осмысленным именем.
+Скрипт для разделения документации из llms.txt на отдельные файлы
+
+По умолчанию читает файл docs/llms.txt, разделяет его по заголовкам
+уровня 2 (##) и сохраняет каждую часть в отдельный файл с осмысленным
+именем в docs/r2r/.
+
+Можно передать несколько входных файлов (--job или --config), каждый
+со своей выходной директорией, уровнем разделения и правилом имен.
+Задания выполняются параллельно в пуле процессов.
+
+Примеры:
+    python scripts/split_r2r_docs.py
+    python scripts/split_r2r_docs.py \
+        --job docs/llms.txt:docs/r2r:2:slug:R2R \
+        --job docs/codegen/llms.txt:docs/codegen-split:2:numbered:Codegen \
+        --combined-index docs/SPLIT_INDEX.md
 """
 
+import argparse
+import json
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Dict, List, Tuple
+
+from docs_catalog import DocsCatalog
+from docs_common import parse_headings, to_project_path
+from run_profiler import RunProfiler, add_profile_arguments
+from staged_writer import StagedWriter
 
 
 def slugify(text: str) -> str:
@@ -29,56 +52,63 @@ def slugify(text: str) -> str:
     return text.lower().strip("-")
 
 
-def extract_first_heading(content: str) -> str | None:
+def extract_first_heading(content: str, level: int = 2) -> str | None:
     """
-    Извлечь первый заголовок уровня 2 (##) из содержимого
+    Извлечь первый заголовок заданного уровня (по умолчанию ##) из содержимого
 
     Args:
         content: Markdown контент
+        level: Уровень заголовка
 
     Returns:
         Текст заголовка или None если не найден
     """
-    # Поиск первого заголовка уровня 2
-    match = re.search(r"^##\s+(.+)$", content, re.MULTILINE)
-    if match:
-        return match.group(1).strip()
+    # Поиск первого заголовка нужного уровня (вне блоков кода)
+    for heading_level, text, _ in parse_headings(content):
+        if heading_level == level:
+            return text
     return None
 
 
-def split_document(file_path: Path) -> List[Tuple[str, str]]:
+def split_document(file_path: Path, level: int = 2) -> List[Tuple[str, str]]:
     """
-    Разделить документ на части по заголовкам уровня 2 (##)
+    Разделить документ на части по заголовкам заданного уровня (по умолчанию ##)
 
     Args:
         file_path: Путь к исходному файлу
+        level: Уровень заголовков, по которым делится документ
 
     Returns:
         Список кортежей (заголовок, содержимое)
     """
     content = file_path.read_text(encoding="utf-8")
 
-    # Находим все позиции заголовков уровня 2
-    pattern = re.compile(r"^##\s+(.+)$", re.MULTILINE)
-    matches = list(pattern.finditer(content))
+    # Находим заголовки нужного уровня; строки "# ..." внутри блоков кода
+    # (комментарии в примерах bash/python) заголовками не считаются
+    headings = [
+        (text, lineno)
+        for heading_level, text, lineno in parse_headings(content)
+        if heading_level == level
+    ]
+
+    # Смещения начала строк (parse_headings нумерует строки так же, через splitlines)
+    line_starts = [0]
+    for line in content.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+    matches = [(text, line_starts[lineno - 1]) for text, lineno in headings]
 
     if not matches:
-        # Если нет заголовков уровня 2, возвращаем весь документ
-        heading = extract_first_heading(content) or "Document"
+        # Если нет заголовков нужного уровня, возвращаем весь документ
+        heading = extract_first_heading(content, level) or "Document"
         return [(heading, content)]
 
     result = []
 
-    for i, match in enumerate(matches):
-        # Заголовок - это текст после ##
-        heading = match.group(1).strip()
-
-        # Начало части - позиция текущего заголовка
-        start = match.start()
-
-        # Конец части - начало следующего заголовка или конец документа
+    for i, (heading, start) in enumerate(matches):
+        # Часть начинается с текущего заголовка и заканчивается
+        # началом следующего заголовка или концом документа
         if i < len(matches) - 1:
-            end = matches[i + 1].start()
+            end = matches[i + 1][1]
         else:
             end = len(content)
 
@@ -91,144 +121,562 @@ def split_document(file_path: Path) -> List[Tuple[str, str]]:
     return result
 
 
-def save_parts(parts: List[Tuple[str, str]], output_dir: Path) -> None:
+# Правила именования файлов: (номер части с 1, заголовок) -> имя без .md
+NAMING_RULES: Dict[str, Callable[[int, str], str]] = {
+    # agent.md, collections.md
+    "slug": lambda i, heading: slugify(heading),
+    # 01_introduction.md (как в docs/docs-r2r)
+    "numbered": lambda i, heading: f"{i:02d}_{slugify(heading).replace('-', '_')}",
+    # section-01.md (вход для rename_sections.py)
+    "section": lambda i, heading: f"section-{i:02d}",
+}
+
+
+def assign_filenames(parts: List[Tuple[str, str]], naming: str = "slug") -> List[str]:
     """
-    Сохранить части документа в отдельные файлы
+    Вычислить имена файлов для частей документа
+
+    Имена считаются один раз и передаются в save_parts и create_index.
+    Повторяющиеся имена получают суффиксы -1, -2, ...
 
     Args:
         parts: Список кортежей (заголовок, содержимое)
-        output_dir: Директория для сохранения файлов
-    """
-    # Создание выходной директории
-    output_dir.mkdir(parents=True, exist_ok=True)
+        naming: Правило именования из NAMING_RULES
 
-    # Статистика
-    total = len(parts)
-    saved = 0
-    skipped = 0
-
-    print(f"\n{'='*60}")
-    print(f"РАЗДЕЛЕНИЕ ДОКУМЕНТА R2R")
-    print(f"{'='*60}\n")
-    print(f"Всего частей: {total}")
-    print(f"Выходная директория: {output_dir.absolute()}\n")
+    Returns:
+        Имена файлов в порядке частей
+    """
+    rule = NAMING_RULES[naming]
 
     # Счетчик для дубликатов имен файлов
-    filename_counts = {}
+    filename_counts: Dict[str, int] = {}
+    filenames = []
 
-    # Сохранение каждой части
-    for i, (heading, content) in enumerate(parts, start=1):
-        # Создание имени файла
-        slug = slugify(heading)
+    for i, (heading, _) in enumerate(parts, start=1):
+        slug = rule(i, heading) or "section"
 
         # Обработка дубликатов
         if slug in filename_counts:
             filename_counts[slug] += 1
-            filename = f"{slug}-{filename_counts[slug]}.md"
+            filenames.append(f"{slug}-{filename_counts[slug]}.md")
         else:
             filename_counts[slug] = 0
-            filename = f"{slug}.md"
+            filenames.append(f"{slug}.md")
+
+    return filenames
+
 
+def save_parts(
+    parts: List[Tuple[str, str]],
+    output_dir: Path,
+    catalog: DocsCatalog | None = None,
+    writer: StagedWriter | None = None,
+    filenames: List[str] | None = None,
+    title: str = "R2R",
+    verbose: bool = True,
+) -> None:
+    """
+    Сохранить части документа в отдельные файлы
+
+    Args:
+        parts: Список кортежей (заголовок, содержимое)
+        output_dir: Директория для сохранения файлов
+        catalog: Каталог документов для регистрации файлов (опционально)
+        writer: Транзакционный писатель; без него файлы пишутся напрямую
+        filenames: Имена файлов из assign_filenames (по умолчанию - правило slug)
+        title: Название документации для вывода
+        verbose: Печатать строку на каждый файл
+    """
+    # Создание выходной директории (writer создает свою staging-директорию)
+    if writer is None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    if filenames is None:
+        filenames = assign_filenames(parts)
+
+    # Статистика
+    total = len(parts)
+    saved = 0
+    skipped = 0
+
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"РАЗДЕЛЕНИЕ ДОКУМЕНТА {title}")
+        print(f"{'='*60}\n")
+        print(f"Всего частей: {total}")
+        print(f"Выходная директория: {output_dir.absolute()}\n")
+
+    # Сохранение каждой части
+    for (heading, content), filename in zip(parts, filenames):
         file_path = output_dir / filename
 
         # Сохранение
-        file_path.write_text(content, encoding="utf-8")
+        if writer is not None:
+            writer.write_text(file_path, content)
+        else:
+            file_path.write_text(content, encoding="utf-8")
+        if catalog is not None:
+            catalog.record_document(file_path, output_dir.name, content)
 
         # Статистика
-        size = len(content)
-        print(f"  ✓ {filename:50s} ({size:>6d} байт) - {heading}")
+        if verbose:
+            size = len(content)
+            print(f"  ✓ {filename:50s} ({size:>6d} байт) - {heading}")
         saved += 1
 
-    print(f"\n{'='*60}")
-    print(f"ИТОГОВАЯ СТАТИСТИКА")
-    print(f"{'='*60}")
-    print(f"✓ Сохранено файлов: {saved}")
-    print(f"⊘ Пропущено: {skipped}")
-    print(f"📁 Директория: {output_dir.absolute()}")
-    print(f"{'='*60}\n")
-
-
-def create_index(parts: List[Tuple[str, str]], output_dir: Path) -> None:
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"ИТОГОВАЯ СТАТИСТИКА")
+        print(f"{'='*60}")
+        print(f"✓ Сохранено файлов: {saved}")
+        print(f"⊘ Пропущено: {skipped}")
+        print(f"📁 Директория: {output_dir.absolute()}")
+        print(f"{'='*60}\n")
+
+
+def create_index(
+    parts: List[Tuple[str, str]],
+    output_dir: Path,
+    catalog: DocsCatalog | None = None,
+    writer: StagedWriter | None = None,
+    filenames: List[str] | None = None,
+    title: str = "R2R",
+    source: str = "docs/llms.txt",
+    verbose: bool = True,
+) -> None:
     """
     Создать индексный файл со списком всех частей
 
     Args:
         parts: Список кортежей (заголовок, содержимое)
         output_dir: Директория с файлами
+        catalog: Каталог документов для регистрации индекса (опционально)
+        writer: Транзакционный писатель; без него файл пишется напрямую
+        filenames: Имена файлов из assign_filenames (по умолчанию - правило slug)
+        title: Название документации
+        source: Исходный файл для ссылки в индексе
+        verbose: Печатать путь созданного индекса
     """
     index_path = output_dir / "README.md"
+    if filenames is None:
+        filenames = assign_filenames(parts)
 
-    index_content = f"""# R2R Documentation - Split Files
+    index_content = f"""# {title} Documentation - Split Files
 
-Документация R2R, разделенная на отдельные файлы для удобной работы.
+Документация {title}, разделенная на отдельные файлы для удобной работы.
 
 ## Статистика
 
 - Всего файлов: {len(parts)}
-- Источник: `docs/llms.txt`
+- Источник: `{source}`
 - Дата разделения: автоматически
 
 ## Оглавление
 
 """
 
-    # Счетчик для дубликатов имен файлов (синхронизирован с save_parts)
-    filename_counts = {}
-
     # Добавление списка файлов
-    for i, (heading, content) in enumerate(parts, start=1):
-        slug = slugify(heading)
-
-        # Обработка дубликатов (как в save_parts)
-        if slug in filename_counts:
-            filename_counts[slug] += 1
-            filename = f"{slug}-{filename_counts[slug]}.md"
-        else:
-            filename_counts[slug] = 0
-            filename = f"{slug}.md"
-
+    for i, ((heading, content), filename) in enumerate(zip(parts, filenames), start=1):
         lines = content.count("\n") + 1
         size = len(content)
         index_content += f"{i}. [{heading}]({filename}) - {lines} строк, {size} байт\n"
 
-    index_content += """
+    index_content += f"""
 ## Использование
 
-Каждый файл содержит отдельную секцию документации R2R.
+Каждый файл содержит отдельную секцию документации {title}.
 Файлы названы по содержимому для удобной навигации.
 
 ## Источник
 
-Оригинальный файл: `docs/llms.txt`
+Оригинальный файл: `{source}`
 Скрипт разделения: `scripts/split_r2r_docs.py`
 """
 
-    index_path.write_text(index_content, encoding="utf-8")
-    print(f"Создан индексный файл: {index_path}")
+    if writer is not None:
+        writer.write_text(index_path, index_content)
+    else:
+        index_path.write_text(index_content, encoding="utf-8")
+    if catalog is not None:
+        catalog.record_document(index_path, output_dir.name, index_content)
+    if verbose:
+        print(f"Создан индексный файл: {index_path}")
+
+
+@dataclass
+class SplitJob:
+    """Задание на разделение одного входного файла"""
+
+    input: Path
+    output_dir: Path
+    level: int = 2
+    naming: str = "slug"
+    title: str | None = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "SplitJob":
+        """
+        Разобрать задание из строки INPUT:OUTPUT[:LEVEL[:NAMING[:TITLE]]]
+
+        Пример: docs/codegen/llms.txt:docs/codegen-split:2:numbered:Codegen
+        """
+        fields = spec.split(":", 4)
+        if len(fields) < 2:
+            raise ValueError(f"Ожидается INPUT:OUTPUT[:LEVEL[:NAMING[:TITLE]]], получено: {spec}")
+        job = cls(Path(fields[0]), Path(fields[1]))
+        if len(fields) > 2 and fields[2]:
+            job.level = int(fields[2])
+        if len(fields) > 3 and fields[3]:
+            job.naming = fields[3]
+        if len(fields) > 4 and fields[4]:
+            job.title = fields[4]
+        return job
+
+    def validate(self) -> None:
+        """Проверить параметры задания"""
+        if not 1 <= self.level <= 6:
+            raise ValueError(f"{self.input}: уровень заголовка должен быть от 1 до 6")
+        if self.naming not in NAMING_RULES:
+            raise ValueError(
+                f"{self.input}: неизвестное правило имен '{self.naming}' "
+                f"(доступны: {', '.join(NAMING_RULES)})"
+            )
+
+
+def validate_jobs(jobs: List[SplitJob]) -> None:
+    """
+    Проверить задания по отдельности и вместе
+
+    Выходные директории не должны совпадать или быть вложенными друг
+    в друга: каждое задание подменяет свою директорию целиком, и задания
+    выполняются параллельно.
+    """
+    for job in jobs:
+        job.validate()
+
+    outputs = [(job, job.output_dir.resolve()) for job in jobs]
+    for i, (job, output_dir) in enumerate(outputs):
+        for other, other_dir in outputs[i + 1 :]:
+            if output_dir == other_dir:
+                raise ValueError(
+                    f"{job.input} и {other.input}: одна выходная директория {job.output_dir}"
+                )
+            if output_dir.is_relative_to(other_dir) or other_dir.is_relative_to(output_dir):
+                raise ValueError(
+                    f"{job.input} и {other.input}: выходные директории вложены друг в друга "
+                    f"({job.output_dir}, {other.output_dir})"
+                )
+
+
+def load_jobs_config(config_path: Path) -> List[SplitJob]:
+    """
+    Загрузить задания из JSON файла
+
+    Формат: [{"input": "...", "output_dir": "...", "level": 2,
+              "naming": "slug", "title": "R2R"}, ...]
+    Относительные пути считаются от директории конфигурации.
+    """
+    base = config_path.parent
+    jobs = []
+    for item in json.loads(config_path.read_text(encoding="utf-8")):
+        jobs.append(
+            SplitJob(
+                input=base / item["input"],
+                output_dir=base / item["output_dir"],
+                level=int(item.get("level", 2)),
+                naming=item.get("naming", "slug"),
+                title=item.get("title"),
+            )
+        )
+    return jobs
+
+
+def run_split_job(
+    job: SplitJob,
+    verbose: bool = True,
+    profiler: RunProfiler | None = None,
+    profile: bool = False,
+) -> dict:
+    """
+    Выполнить одно задание: разделить файл и записать новое поколение
+    выходной директории
+
+    Функция верхнего уровня, чтобы ее можно было запускать в пуле процессов.
+
+    Args:
+        job: Задание
+        verbose: Подробный вывод по каждому файлу
+        profiler: Профилировщик фаз (только при запуске в текущем процессе)
+        profile: Замерить фазы задания собственным профилировщиком
+            (при запуске в пуле процессов)
+
+    Returns:
+        Сводка по заданию (пути, количество частей, размер, время,
+        фазы при профилировании)
+    """
+    profiler = profiler or RunProfiler("split_r2r_docs", enabled=profile)
+    first_phase = len(profiler.phases)
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    title = job.title or job.output_dir.name
+
+    with profiler.phase("split"):
+        parts = split_document(job.input, job.level)
+        filenames = assign_filenames(parts, job.naming)
+
+    with DocsCatalog() as catalog:
+        # Новое поколение выходной директории собирается в staging и подменяется целиком
+        writer = StagedWriter(job.output_dir)
+        writer.begin()
+        try:
+            # Записи каталога попадают в базу только после успешного commit
+            with catalog.transaction():
+                with profiler.phase("save_parts"):
+                    save_parts(parts, job.output_dir, catalog, writer, filenames, title, verbose)
+
+                with profiler.phase("create_index"):
+                    create_index(
+                        parts,
+                        job.output_dir,
+                        catalog,
+                        writer,
+                        filenames,
+                        title,
+                        to_project_path(job.input),
+                        verbose,
+                    )
+
+                with profiler.phase("commit"):
+                    writer.commit()
+        except BaseException:
+            writer.rollback()
+            raise
+
+        with profiler.phase("catalog"):
+            catalog.flush()
+            # Новое поколение заменило директорию целиком: части прошлого
+            # разбиения исчезли с диска и не должны оставаться в каталоге
+            catalog.remove_missing(
+                job.output_dir.name, list(job.output_dir.rglob("*.md")), job.output_dir
+            )
+
+    return {
+        "input": to_project_path(job.input),
+        "output_dir": to_project_path(job.output_dir),
+        "level": job.level,
+        "naming": job.naming,
+        "title": title,
+        "parts": [
+            {"heading": heading, "file": filename, "size": len(content)}
+            for (heading, content), filename in zip(parts, filenames)
+        ],
+        "bytes": sum(len(content) for _, content in parts),
+        "seconds": round(time.perf_counter() - started, 3),
+        "cpu_seconds": round(time.process_time() - cpu_started, 3),
+        "phases": profiler.phases[first_phase:],
+    }
+
+
+def failed_summary(job: SplitJob, error: BaseException) -> dict:
+    """Сводка по заданию, завершившемуся ошибкой"""
+    return {
+        "input": to_project_path(job.input),
+        "output_dir": to_project_path(job.output_dir),
+        "level": job.level,
+        "naming": job.naming,
+        "title": job.title or job.output_dir.name,
+        "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def run_split_jobs(
+    jobs: List[SplitJob], workers: int | None = None, profiler: RunProfiler | None = None
+) -> List[dict]:
+    """
+    Выполнить задания параллельно в пуле процессов
+
+    Одно задание выполняется в текущем процессе с подробным выводом
+    и пофазным профилированием; в пуле фазы каждого задания замеряются
+    в его процессе и добавляются в отчет профилировщика по заданиям.
+    Ошибка одного задания не останавливает остальные: она попадает
+    в сводку задания (поле error).
+
+    Returns:
+        Сводки по заданиям в порядке jobs
+    """
+    profiler = profiler or RunProfiler("split_r2r_docs")
+    if len(jobs) == 1:
+        try:
+            return [run_split_job(jobs[0], profiler=profiler)]
+        except Exception as e:
+            return [failed_summary(jobs[0], e)]
+
+    summaries: List[dict | None] = [None] * len(jobs)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_split_job, job, False, None, profiler.enabled): i
+            for i, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                summaries[i] = future.result()
+            except Exception as e:
+                summaries[i] = failed_summary(jobs[i], e)
+                print(f"❌ {jobs[i].input}: {summaries[i]['error']}")
+
+    for summary in summaries:
+        if "error" not in summary:
+            profiler.add_job(
+                f"{summary['input']} -> {summary['output_dir']}",
+                summary["seconds"],
+                summary["cpu_seconds"],
+                summary["phases"],
+            )
+    return summaries
+
+
+def create_combined_index(summaries: List[dict], index_path: Path) -> None:
+    """
+    Создать общий индекс по всем заданиям
+
+    Args:
+        summaries: Сводки из run_split_job
+        index_path: Путь к markdown файлу индекса
+    """
+    total_parts = sum(len(summary["parts"]) for summary in summaries)
+    content = f"""# Split Documentation - Combined Index
+
+## Статистика
+
+- Источников: {len(summaries)}
+- Всего файлов: {total_parts}
+
+| Источник | Директория | Уровень | Файлов | Байт |
+|----------|------------|---------|--------|------|
+"""
+    for summary in summaries:
+        content += (
+            f"| `{summary['input']}` | `{summary['output_dir']}` | {summary['level']} "
+            f"| {len(summary['parts'])} | {summary['bytes']} |\n"
+        )
+
+    for summary in summaries:
+        output_dir = Path(summary["output_dir"])
+        content += f"\n## {summary['title']}\n\n"
+        for i, part in enumerate(summary["parts"], start=1):
+            link = os.path.relpath(output_dir / part["file"], to_project_path(index_path.parent))
+            content += f"{i}. [{part['heading']}]({Path(link).as_posix()})\n"
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index_path.write_text(content, encoding="utf-8")
+    print(f"Создан общий индекс: {index_path}")
 
 
 def main():
     """Главная функция"""
-    # Пути (скрипт находится в scripts/, корень проекта - на уровень выше)
-    base_dir = Path(__file__).parent.parent
-    input_file = base_dir / "docs" / "llms.txt"
-    output_dir = base_dir / "docs" / "r2r"
-
-    # Проверка существования входного файла
-    if not input_file.exists():
-        print(f"❌ Ошибка: файл не найден - {input_file}")
-        return 1
-
-    print(f"Чтение файла: {input_file}")
+    parser = argparse.ArgumentParser(
+        description="Разделение документации из llms.txt на отдельные файлы"
+    )
+    parser.add_argument(
+        "--job",
+        action="append",
+        default=[],
+        metavar="INPUT:OUTPUT[:LEVEL[:NAMING[:TITLE]]]",
+        help="Задание на разделение (можно указать несколько). "
+        f"Правила имен: {', '.join(NAMING_RULES)}",
+    )
+    parser.add_argument(
+        "--config", help="JSON файл со списком заданий (input, output_dir, level, naming, title)"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Количество процессов (по умолчанию: число ядер)"
+    )
+    parser.add_argument("--combined-index", help="Путь к общему markdown индексу всех заданий")
+    parser.add_argument("--summary-json", help="Записать сводку по заданиям в JSON")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler = RunProfiler.from_args(args, "split_r2r_docs")
+
+    # Отчет профилировщика пишется и для неудачных запусков
+    exit_code = 1
+    try:
+        exit_code = run(args, profiler)
+    finally:
+        profiler.finish(exit_code)
+    return exit_code
+
+
+def run(args: argparse.Namespace, profiler: RunProfiler) -> int:
+    """
+    Выполнить задания из разобранных аргументов командной строки
 
-    # Разделение документа
-    parts = split_document(input_file)
+    Returns:
+        Код возврата
+    """
+    try:
+        jobs = [SplitJob.parse(spec) for spec in args.job]
+        if args.config:
+            jobs += load_jobs_config(Path(args.config))
+        if not jobs:
+            # Пути (скрипт находится в scripts/, корень проекта - на уровень выше)
+            base_dir = Path(__file__).parent.parent
+            jobs = [
+                SplitJob(base_dir / "docs" / "llms.txt", base_dir / "docs" / "r2r", title="R2R")
+            ]
+        validate_jobs(jobs)
+    except (ValueError, TypeError, KeyError, json.JSONDecodeError) as e:
+        print(f"❌ Ошибка в заданиях: {e}")
+        return 1
 
-    # Сохранение частей
-    save_parts(parts, output_dir)
+    # Проверка существования входных файлов
+    missing = [job.input for job in jobs if not job.input.exists()]
+    if missing:
+        for input_file in missing:
+            print(f"❌ Ошибка: файл не найден - {input_file}")
+        return 1
 
-    # Создание индекса
-    create_index(parts, output_dir)
+    for job in jobs:
+        print(f"Чтение файла: {job.input}")
+
+    # Разделение документов (несколько заданий - параллельно в пуле процессов)
+    if len(jobs) == 1:
+        summaries = run_split_jobs(jobs, profiler=profiler)
+    else:
+        with profiler.phase("split_jobs"):
+            summaries = run_split_jobs(jobs, args.workers, profiler)
+    succeeded = [summary for summary in summaries if "error" not in summary]
+    failed = [summary for summary in summaries if "error" in summary]
+
+    # Индекс строится по успешным заданиям: их директории уже подменены
+    if args.combined_index and succeeded:
+        with profiler.phase("combined_index"):
+            create_combined_index(succeeded, Path(args.combined_index))
+
+    if args.summary_json:
+        Path(args.summary_json).write_text(
+            json.dumps(summaries, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    if len(summaries) > 1:
+        print(f"\n{'='*60}")
+        print("СВОДКА ПО ЗАДАНИЯМ")
+        print(f"{'='*60}")
+        for summary in summaries:
+            if "error" in summary:
+                print(f"  {summary['input']:35s} -> {summary['output_dir']:25s} ошибка")
+                continue
+            print(
+                f"  {summary['input']:35s} -> {summary['output_dir']:25s} "
+                f"{len(summary['parts']):>4d} файлов {summary['seconds']:>7.3f} с"
+            )
+        print(f"{'='*60}\n")
+
+    if failed:
+        for summary in failed:
+            print(f"❌ Ошибка в задании {summary['input']}: {summary['error']}")
+        print(f"❌ Завершено с ошибками: {len(failed)} из {len(summaries)} заданий")
+        return 1
 
     print("✅ Разделение документа завершено успешно!")
     return 0
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Транзакционная запись выходной директории
+
+Весь вывод сначала пишется в соседнюю staging-директорию
+(.<имя>.staging-<pid>) пулом потоков. После каждого пакета данные
+сбрасываются на диск одним syncfs(2) (без него - fsync файлов пакета
+одним проходом), затем синхронизируются затронутые директории. В конце
+staging-директория атомарно подменяет живую.
+Читатели видят либо старое, либо новое поколение целиком, но никогда
+не полуобновленное дерево.
+
+Использование:
+    with StagedWriter(output_dir) as writer:
+        writer.write_text(output_dir / "a.md", "...")
+    # при выходе без исключения - commit, иначе - rollback
+"""
+
+import ctypes
+import ctypes.util
+import os
+import shutil
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Set
+
+# renameat2(2) флаг атомарного обмена двух путей (Linux >= 3.15)
+RENAME_EXCHANGE = 2
+AT_FDCWD = -100
+
+
+def _exchange_dirs(first: Path, second: Path) -> bool:
+    """
+    Атомарно поменять местами две директории через renameat2
+
+    Returns:
+        True если обмен выполнен, False если система его не поддерживает
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError, TypeError):
+        return False
+
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    result = renameat2(
+        AT_FDCWD, os.fsencode(first), AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE
+    )
+    return result == 0
+
+
+def _syncfs(path: Path) -> bool:
+    """
+    Сбросить на диск файловую систему, содержащую path, одним вызовом syncfs
+
+    Returns:
+        True если синхронизация выполнена, False если система ее не поддерживает
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        syncfs = libc.syncfs
+    except (OSError, AttributeError, TypeError):
+        return False
+
+    syncfs.argtypes = [ctypes.c_int]
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return syncfs(fd) == 0
+    finally:
+        os.close(fd)
+
+
+def _fsync_file(path: Path) -> None:
+    """Сбросить на диск содержимое файла"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: Path) -> None:
+    """Сбросить на диск запись директории (новые/переименованные элементы)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_file(path: str, content: bytes, replace: bool) -> str:
+    """
+    Записать файл в staging (на диск он сбрасывается вместе с пакетом)
+
+    Директория файла к этому моменту уже создана писателем.
+
+    Args:
+        path: Путь в staging-директории
+        content: Содержимое
+        replace: Файл мог быть перенесен из живой директории жесткой
+            ссылкой - его нужно удалить, иначе запись изменит и живую копию
+
+    Returns:
+        Путь записанного файла
+    """
+    if replace:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+class StagedWriter:
+    """
+    Писатель выходной директории с подменой поколения целиком
+
+    Args:
+        output_dir: Живая выходная директория
+        keep_existing: Перенести текущее содержимое в новое поколение
+            (для инкрементальных загрузчиков); иначе поколение
+            создается с нуля и устаревшие файлы исчезают
+        max_workers: Размер пула потоков записи
+        batch_size: Количество файлов в пакете (после пакета
+            синхронизируются затронутые директории)
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        keep_existing: bool = False,
+        max_workers: int | None = None,
+        batch_size: int = 256,
+    ):
+        self.output_dir = Path(output_dir).absolute()
+        self.staging_dir = self.output_dir.parent / f".{self.output_dir.name}.staging-{os.getpid()}"
+        self.keep_existing = keep_existing
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.batch_size = batch_size
+        self.stats = {"written": 0, "batches": 0}
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending: List[Future] = []
+        # Уже существующие директории staging и директории, в которых
+        # с последнего пакета появились новые поддиректории
+        self._dirs: Set[str] = set()
+        self._touched_dirs: Set[str] = set()
+
+    def __enter__(self) -> "StagedWriter":
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def begin(self) -> None:
+        """Подготовить staging-директорию и пул потоков"""
+        if self.staging_dir.exists():
+            shutil.rmtree(self.staging_dir)
+        self.output_dir.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.keep_existing and self.output_dir.is_dir():
+            # Жесткие ссылки вместо копирования: перенос почти бесплатный
+            try:
+                shutil.copytree(self.output_dir, self.staging_dir, copy_function=os.link)
+            except (OSError, shutil.Error):
+                shutil.rmtree(self.staging_dir, ignore_errors=True)
+                shutil.copytree(self.output_dir, self.staging_dir)
+        else:
+            self.staging_dir.mkdir()
+            # Права живой директории переходят к новому поколению
+            if self.output_dir.is_dir():
+                shutil.copymode(self.output_dir, self.staging_dir)
+
+        self._dirs = {str(self.staging_dir)}
+        self._touched_dirs = set()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def staged_path(self, path: Path) -> Path:
+        """Путь внутри staging-директории для пути живой директории"""
+        return Path(self._staged_path(path))
+
+    def _staged_path(self, path: Path) -> str:
+        """staged_path() на строках: вызывается для каждого файла"""
+        path = os.fspath(path)
+        output_dir = str(self.output_dir)
+        absolute = os.path.abspath(path)
+        if os.path.isabs(path) or absolute == output_dir or absolute.startswith(output_dir + os.sep):
+            path = os.path.relpath(absolute, output_dir)
+        return os.path.join(self.staging_dir, path)
+
+    def _ensure_dir(self, directory: str) -> None:
+        """Создать директорию в staging, запомнив родителей новых директорий"""
+        missing = []
+        while directory not in self._dirs and not os.path.isdir(directory):
+            missing.append(directory)
+            directory = os.path.dirname(directory)
+        for new_dir in reversed(missing):
+            os.mkdir(new_dir)
+            self._touched_dirs.add(os.path.dirname(new_dir))
+            self._dirs.add(new_dir)
+
+    def write_text(self, path: Path, content: str, encoding: str = "utf-8") -> None:
+        """
+        Поставить файл в очередь записи
+
+        Args:
+            path: Путь в живой директории (абсолютный, относительный от
+                текущей директории или относительный от output_dir)
+            content: Содержимое файла
+            encoding: Кодировка
+        """
+        if self._pool is None:
+            raise RuntimeError("StagedWriter не запущен: используйте begin() или with")
+
+        staged = self._staged_path(path)
+        directory = os.path.dirname(staged)
+        if directory not in self._dirs:
+            self._ensure_dir(directory)
+            self._dirs.add(directory)
+        self._pending.append(
+            self._pool.submit(_write_file, staged, content.encode(encoding), self.keep_existing)
+        )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Дождаться записи текущего пакета и синхронизировать его директории"""
+        if not self._pending:
+            return
+
+        # result() пробрасывает ошибку записи
+        files = [future.result() for future in self._pending]
+        # Одна синхронизация на пакет вместо fsync в каждом потоке
+        if not _syncfs(self.staging_dir):
+            for file_path in files:
+                _fsync_file(file_path)
+
+        self.stats["written"] += len(self._pending)
+        self.stats["batches"] += 1
+        self._pending.clear()
+
+        # Записи о новых файлах и поддиректориях - один fsync на директорию за пакет
+        directories = {os.path.dirname(file_path) for file_path in files} | self._touched_dirs
+        self._touched_dirs = set()
+        for directory in directories:
+            _fsync_dir(directory)
+
+    def commit(self) -> None:
+        """Записать остаток и атомарно подменить живую директорию"""
+        try:
+            self.flush()
+        except Exception:
+            self.rollback()
+            raise
+        self._shutdown()
+        _fsync_dir(self.staging_dir)
+
+        if self.output_dir.exists() and _exchange_dirs(self.staging_dir, self.output_dir):
+            # Теперь в staging_dir лежит прошлое поколение
+            shutil.rmtree(self.staging_dir)
+        elif self.output_dir.exists():
+            # Запасной путь: два rename с коротким окном отсутствия директории
+            previous = self.output_dir.parent / f".{self.output_dir.name}.previous-{os.getpid()}"
+            os.rename(self.output_dir, previous)
+            os.rename(self.staging_dir, self.output_dir)
+            shutil.rmtree(previous)
+        else:
+            os.rename(self.staging_dir, self.output_dir)
+
+        _fsync_dir(self.output_dir.parent)
+
+    def rollback(self) -> None:
+        """Отменить поколение: живая директория остается нетронутой"""
+        self._shutdown(cancel=True)
+        self._pending.clear()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _shutdown(self, cancel: bool = False) -> None:
+        """Остановить пул потоков"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=cancel)
+            self._pool = None